@@ -0,0 +1,3 @@
+from poly_fuzzer.cli import main
+
+main()
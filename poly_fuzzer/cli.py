@@ -0,0 +1,328 @@
+"""Command line interface: `python -m poly_fuzzer {fuzz,replay,minimize,plot,bench} ...`
+
+Targets are given as `module:attribute`, e.g. `urllib.parse:urlparse` or `cgi_decode:cgi_decode`.
+Attribute parts ending with `()` are called, so `html.parser:HTMLParser().feed` is the `feed` method
+of a new parser. Only the standard library is imported at startup: every command imports what it needs.
+"""
+import argparse
+import importlib
+import json
+import sys
+import time
+
+
+def resolve(spec: str):
+    """Return the object named by a `module:attribute` spec."""
+    module_name, _, path = spec.partition(":")
+    target = importlib.import_module(module_name)
+    for part in path.split(".") if path else []:
+        call = part.endswith("()")
+        target = getattr(target, part.removesuffix("()"))
+        if call:
+            target = target()
+    return target
+
+
+def _read_seeds(args) -> list[str]:
+    seeds = list(args.seed or [])
+    if args.seeds_file:
+        with open(args.seeds_file, encoding="utf-8") as f:
+            seeds.extend(line.rstrip("\n") for line in f)
+    return seeds or [""]
+
+
+def _make_executor(args):
+    target = resolve(args.target)
+    options = {"tracer": args.tracer, "edge_coverage": args.edges}
+    if args.executor == "forkserver":
+        from poly_fuzzer.common.forkserver_executor import ForkserverExecutor
+        return ForkserverExecutor(target, timeout=args.timeout, memory_limit=args.memory_limit, **options)
+    if args.executor == "persistent":
+        from poly_fuzzer.common.persistent_executor import PersistentExecutor
+        return PersistentExecutor(factory=lambda: resolve(args.target), **options)
+    if getattr(args, "differential", None):
+        from poly_fuzzer.common.differential_executor import DifferentialExecutor
+        known_differences = dict(pair.split("=", 1) for pair in args.known_difference or [])
+        return DifferentialExecutor(
+            target, resolve(args.differential), known_differences=known_differences, **options
+        )
+    from poly_fuzzer.common.abstract_executor import AbstractExecutor
+    return AbstractExecutor(target, **options)
+
+
+def _make_fuzzer(args, executor):
+    from poly_fuzzer.common.abstract_seed import AbstractSeed
+    from poly_fuzzer.common.random_state import derive_rng
+
+    schedule = None
+    if args.schedule == "url":
+        from poly_fuzzer.power_schedules.url_schedule import URLPowerSchedule
+        schedule = URLPowerSchedule(derive_rng(args.rng_seed, "schedule"))
+    elif args.schedule == "coverage":
+        from poly_fuzzer.power_schedules.coverage_schedule import CoveragePowerSchedule
+        schedule = CoveragePowerSchedule(derive_rng(args.rng_seed, "schedule"))
+
+    corpus = None
+    if getattr(args, "corpus", None):
+        from poly_fuzzer.common.corpus_store import CorpusStore
+        corpus = CorpusStore(args.corpus)
+
+    rng = derive_rng(args.rng_seed, "fuzzer")
+    if args.grammar:
+        from poly_fuzzer.fuzzers.grammar_mutation_fuzzer import GrammarMutationFuzzer
+        grammar = resolve(args.grammar)
+        grammar.rng = derive_rng(args.rng_seed, "grammar")
+        return GrammarMutationFuzzer(executor, grammar, power_schedule=schedule, rng=rng, corpus=corpus)
+    from poly_fuzzer.fuzzers.mutation_fuzzer import MutationFuzzer
+    seeds = [AbstractSeed(seed) for seed in _read_seeds(args)]
+    return MutationFuzzer(executor, seeds, schedule, rng=rng, corpus=corpus)
+
+
+def _add_campaign_arguments(parser):
+    parser.add_argument("target", help="module:attribute of the function to fuzz")
+    parser.add_argument("--seed", action="append", help="initial seed (repeatable)")
+    parser.add_argument("--seeds-file", help="file with one initial seed per line")
+    parser.add_argument("--grammar", help="module:attribute of an AbstractGrammar, for grammar mutation fuzzing")
+    parser.add_argument("--schedule", choices=("none", "url", "coverage"), default="none")
+    parser.add_argument("--rng-seed", type=int, default=0, help="seed of all the random generators")
+    parser.add_argument("--executor", choices=("inprocess", "forkserver", "persistent"), default="inprocess")
+    parser.add_argument("--tracer", choices=("auto", "settrace", "monitoring", "legacy"), default="auto")
+    parser.add_argument("--edges", action="store_true", help="AFL-style edge coverage")
+    parser.add_argument("--timeout", type=float, default=1.0, help="forkserver: seconds per input")
+    parser.add_argument("--memory-limit", type=int, help="forkserver: MB per input")
+
+
+def cmd_fuzz(args):
+    executor = _make_executor(args)
+    fuzzer = _make_fuzzer(args, executor)
+    if args.crash_dir:
+        from poly_fuzzer.common.crash_triage import CrashTriage
+        fuzzer.triage = CrashTriage(args.crash_dir)
+    if args.stream_inputs:
+        from poly_fuzzer.common.results_sink import StreamingSink
+        fuzzer.sink_factory = lambda: StreamingSink(inputs_path=args.stream_inputs)
+    if args.stats_interval or args.stats_file:
+        from poly_fuzzer.common.campaign_stats import CampaignStats, FuzzerStatsFile, stats_line
+        callbacks = [stats_line()] if args.stats_interval else []
+        if args.stats_file:
+            callbacks.append(FuzzerStatsFile(args.stats_file))
+        fuzzer.stats = CampaignStats(args.stats_interval or 5.0, callbacks)
+        executor.overhead_sample_interval = args.overhead_sample
+
+    from poly_fuzzer.common.budget import Budget
+    limits = (args.budget, args.seconds, args.plateau_execs, args.plateau_seconds)
+    budget = Budget(*limits) if any(limit is not None for limit in limits) else Budget(1000)
+    data = fuzzer.run_fuzzer(budget)
+    summary = {
+        "target": args.target,
+        "rng_seed": args.rng_seed,
+        "executions": data["executions"],
+        "coverage": data["coverage"][-1] if data["executions"] else 0,
+        "exceptions": data["exceptions"],
+        "crashes": fuzzer.triage.summary(),
+        "execs_per_sec": data["execs_per_sec"],
+        "run_time": data["run_time"],
+        "stop_reason": data["stop_reason"],
+        "interesting": data["interesting"],
+        "stats": fuzzer.stats.snapshot(fuzzer),
+    }
+    from poly_fuzzer.common.differential_executor import DifferentialExecutor
+    if isinstance(executor, DifferentialExecutor):
+        summary["divergence_count"] = executor.divergence_count
+        summary["divergences"] = [vars(divergence) for divergence in executor.divergences]
+    if hasattr(executor, "close"):
+        executor.close()
+    _write_json(summary, args.output)
+
+
+def cmd_replay(args):
+    with open(args.results, encoding="utf-8") as f:
+        interesting = json.load(f)["interesting"]
+    executor = _make_executor(args)
+    fuzzer = _make_fuzzer(args, executor)
+    input = fuzzer.replay(args.index, interesting)
+    exceptions, execution_time, _ = executor._execute_input(input)
+    _write_json({
+        "index": args.index,
+        "input": input,
+        "coverage": sorted(executor.input_coverage),
+        "exception": repr(executor.last_exception) if exceptions else None,
+    }, args.output)
+
+
+def cmd_minimize(args):
+    from poly_fuzzer.tools import minimization
+
+    executor = _make_executor(args)
+    if args.corpus:
+        from poly_fuzzer.common.corpus_store import CorpusStore
+        store = CorpusStore(args.corpus)
+        kept = minimization.minimize_store(store, executor)
+        if args.output:
+            minimized = CorpusStore(args.output)
+            for seed in kept:
+                minimized.add(seed, store.lines(store.content_hash(seed.data)))
+        _write_json({"seeds": len(store), "kept": [seed.data for seed in kept]}, None)
+        return
+
+    input = args.input
+    if args.input_file:
+        with open(args.input_file, encoding="utf-8", errors="surrogateescape") as f:
+            input = f.read()
+    exceptions, _, _ = executor._execute_input(input)
+    if exceptions and not args.keep_coverage:
+        # Crasher: keep the same exception type
+        test = minimization.raises_like(executor, executor.last_exception)
+    else:
+        test = minimization.keeps_coverage(executor, set(executor.input_coverage))
+    minimized = minimization.minimize_input(input, test)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", errors="surrogateescape") as f:
+            f.write(minimized)
+    _write_json({"length": len(input), "minimized": minimized}, None)
+
+
+def cmd_plot(args):
+    import matplotlib.pyplot as plt
+    import numpy as np
+    from poly_fuzzer.fuzzers.experiment_runner import load_results
+
+    results = load_results(args.results)
+    for name, curves in results.items():
+        plt.plot(range(1, curves.shape[1] + 1), np.average(curves, axis=0), label=name)
+    plt.xlabel("Number of generated inputs")
+    plt.ylabel("Covered lines")
+    plt.grid(True, "both", "both")
+    plt.legend()
+    if args.output:
+        plt.savefig(args.output)
+    else:
+        plt.show()
+
+
+def cmd_bench(args):
+    if args.target is None:
+        _bench_suite(args)
+        return
+    from poly_fuzzer.common.abstract_executor import AbstractExecutor
+
+    target = resolve(args.target)
+    seeds = _read_seeds(args)
+    inputs = (seeds * (args.executions // len(seeds) + 1))[:args.executions]
+
+    start = time.perf_counter()
+    for input in inputs:
+        try:
+            target(input)
+        except Exception:
+            pass
+    untraced = len(inputs) / (time.perf_counter() - start)
+
+    executor = AbstractExecutor(target, tracer=args.tracer)
+    start = time.perf_counter()
+    for input in inputs:
+        executor._execute_input(input)
+    traced = len(inputs) / (time.perf_counter() - start)
+    _write_json({"target": args.target, "untraced_execs_per_sec": untraced, "traced_execs_per_sec": traced}, args.output)
+
+
+def _bench_suite(args):
+    from poly_fuzzer.tools import benchmarks
+
+    report = benchmarks.run_benchmarks(quick=args.quick)
+    _write_json(report, args.output)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        changes = benchmarks.compare(baseline, report, args.threshold)
+        for name, entry in sorted(changes.items()):
+            mark = "REGRESSION" if entry["regression"] else ""
+            print(f"{name:55s} {entry['change']:+7.1%} {mark}", file=sys.stderr)
+        if any(entry["regression"] for entry in changes.values()):
+            sys.exit(1)
+
+
+def _write_json(data, path: str | None):
+    text = json.dumps(data, indent=2, default=str)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m poly_fuzzer", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fuzz = commands.add_parser("fuzz", help="run a mutation fuzzing campaign")
+    _add_campaign_arguments(fuzz)
+    fuzz.add_argument("--budget", type=int, help="number of inputs (1000 when no limit is given)")
+    fuzz.add_argument("--seconds", type=float, help="wall-clock limit")
+    fuzz.add_argument("--plateau-execs", type=int, help="stop after N inputs without new coverage")
+    fuzz.add_argument("--plateau-seconds", type=float, help="stop after T seconds without new coverage")
+    fuzz.add_argument("--corpus", help="persistent corpus directory (resumed if it exists)")
+    fuzz.add_argument("--crash-dir", help="directory of the crash reproducers")
+    fuzz.add_argument(
+        "--differential", help="module:attribute of another implementation of the target, run on every input "
+        "to report the inputs on which their outputs or exceptions differ (inprocess executor)",
+    )
+    fuzz.add_argument(
+        "--known-difference", action="append", metavar="REFERENCE=ALTERNATIVE",
+        help="--differential: exception type raised by the alternative instead of the reference's, "
+        "e.g. IndexError=ValueError for cgi_decode:cgi_decode_fast (repeatable)",
+    )
+    fuzz.add_argument("--stream-inputs", help="gzip file receiving every input, keeps memory bounded")
+    fuzz.add_argument("--stats-interval", type=float, help="print a status line to stderr every N seconds")
+    fuzz.add_argument("--stats-file", help="JSON file rewritten with the campaign statistics (every 5 s by default)")
+    fuzz.add_argument(
+        "--overhead-sample", type=int, default=1000,
+        help="with statistics, run every Nth input again untraced to measure the tracing overhead (0: never)",
+    )
+    fuzz.add_argument("--output", help="JSON summary file (stdout by default)")
+    fuzz.set_defaults(func=cmd_fuzz)
+
+    replay = commands.add_parser("replay", help="regenerate and run input #index of a campaign")
+    _add_campaign_arguments(replay)
+    replay.add_argument("results", help="JSON summary written by the fuzz command")
+    replay.add_argument("index", type=int)
+    replay.add_argument("--output", help="JSON file (stdout by default)")
+    replay.set_defaults(func=cmd_replay)
+
+    minimize = commands.add_parser("minimize", help="distill a corpus (cmin) or minimize an input (tmin)")
+    _add_campaign_arguments(minimize)
+    source = minimize.add_mutually_exclusive_group(required=True)
+    source.add_argument("--corpus", help="corpus directory to distill")
+    source.add_argument("--input", help="input to minimize")
+    source.add_argument("--input-file", help="file holding the input to minimize")
+    minimize.add_argument("--keep-coverage", action="store_true", help="keep the coverage of a crashing input")
+    minimize.add_argument("--output", help="distilled corpus directory, or minimized input file")
+    minimize.set_defaults(func=cmd_minimize)
+
+    plot = commands.add_parser("plot", help="plot the average coverage curves of an experiment")
+    plot.add_argument("results", help=".npz file written by run_experiment")
+    plot.add_argument("--output", help="image file (shown in a window by default)")
+    plot.set_defaults(func=cmd_plot)
+
+    bench = commands.add_parser(
+        "bench", help="execs/sec of a target, untraced and traced, or the whole benchmark suite without target"
+    )
+    bench.add_argument("target", nargs="?", help="module:attribute of the function to run")
+    bench.add_argument("--seed", action="append", help="input to run (repeatable)")
+    bench.add_argument("--seeds-file", help="file with one input per line")
+    bench.add_argument("--executions", type=int, default=10000)
+    bench.add_argument("--tracer", choices=("auto", "settrace", "monitoring", "legacy"), default="auto")
+    bench.add_argument("--quick", action="store_true", help="suite: a tenth of the work")
+    bench.add_argument("--compare", help="suite: previous JSON report, exits with 1 on regressions")
+    bench.add_argument("--threshold", type=float, default=0.1, help="suite: slowdown counted as a regression")
+    bench.add_argument("--output", help="JSON file (stdout by default)")
+    bench.set_defaults(func=cmd_bench)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "differential", None) and args.executor != "inprocess":
+        fuzz.error("--differential requires --executor inprocess")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
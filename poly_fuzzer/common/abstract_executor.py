@@ -2,40 +2,191 @@ import inspect
 import time
 import sys
 
+from poly_fuzzer.common.coverage_tracer import make_tracer
+
+
+class ExecutionResult:
+    """Results of the execution of one input."""
+
+    def __init__(
+        self,
+        input,
+        exceptions: int,
+        execution_time: float,
+        new_coverage: set,
+        input_coverage,
+        total_coverage: int,
+        exception=None,
+    ) -> None:
+        self.input = input
+        self.exceptions = exceptions
+        self.execution_time = execution_time
+        self.new_coverage = new_coverage
+        self.input_coverage = input_coverage
+        # Number of lines covered by all the inputs executed so far, this one included
+        self.total_coverage = total_coverage
+        self.exception = exception
+
 
 class AbstractExecutor:
     '''
-        
+
     # The `AbstractExecutor` class is a Python class that provides functionality for executing a program
     # module and tracking code coverage.
+    `tracer` selects the coverage backend: "auto" (default), "settrace", "monitoring" (Python 3.12+)
+    or "legacy" for the original `trace_function`.
+    With `edge_coverage`, novelty is decided on an AFL-style edge map instead of the line set:
+    `_execute_input` then returns the new map indices, line coverage is still tracked for reporting.
     '''
-    def __init__(self, program_module):
+    def __init__(self, program_module, tracer: str = "auto", edge_coverage: bool = False, map_size: int = 1 << 16):
         self.program_module = program_module
         self.module_name = program_module.__name__
         self.func_name = inspect.getmodule(program_module).__name__
         self.file_name = inspect.getsourcefile(program_module)
-        self._full_coverage = []
+        # Cumulative coverage of all the inputs and coverage of the current input
         self._coverage = set()
+        self._input_coverage = set()
+        # Per code object decision: does it belong to the target module?
+        self._target_cache = {}
+        self.tracer_name = tracer
+        self.edge_map = None
+        if edge_coverage:
+            # NumPy is only loaded for edge coverage
+            from poly_fuzzer.common.edge_coverage import EdgeCoverageMap
+            self.edge_map = EdgeCoverageMap(map_size)
+        if tracer == "legacy":
+            assert self.edge_map is None, "Edge coverage is not supported by the legacy tracer."
+            self._tracer = None
+        else:
+            self._tracer = make_tracer(
+                tracer, self._is_target, self._input_coverage.add, self.edge_map
+            )
+        self.executions = 0
+        self.total_execution_time = 0.0
+        # Every `overhead_sample_interval` executions (0: never), the input is run again without tracing
+        # to estimate the cost of tracing
+        self.overhead_sample_interval = 0
+        self._sampled_traced_time = 0.0
+        self._sampled_untraced_time = 0.0
+        # Output of the target and exception raised by the last executed input, if any
+        self.last_output = None
+        self.last_exception = None
 
     def _execute_input(self, input):
+        """Execute the input and return the number of exceptions, the execution time
+        and the lines covered for the first time by this input."""
+        exceptions, execution_time = self._run(input)
+        if self.overhead_sample_interval and self.executions % self.overhead_sample_interval == 0:
+            self._sampled_traced_time += execution_time
+            self._sampled_untraced_time += self._run_untraced(input)
+
+        self.executions += 1
+        self.total_execution_time += execution_time
+        new_coverage = self._input_coverage - self._coverage
+        self._coverage |= new_coverage
+        if self.edge_map is not None:
+            new_coverage = self.edge_map.update_virgin()
+
+        return exceptions, execution_time, new_coverage
+
+    def execute_batch(self, inputs: list) -> list[ExecutionResult]:
+        """Execute the inputs in order and return their results.
+        Executors able to run several inputs at once (worker pool, fork server, remote target) override it."""
+        results = []
+        for input in inputs:
+            exceptions, execution_time, new_coverage = self._execute_input(input)
+            results.append(ExecutionResult(
+                input, exceptions, execution_time, new_coverage,
+                frozenset(self._input_coverage), len(self.coverage), self.last_exception,
+            ))
+        return results
+
+    async def execute_batch_async(self, inputs: list) -> list[ExecutionResult]:
+        """Awaitable `execute_batch`: by default the batch runs in a worker thread,
+        so the event loop (e.g. the generation of the next batch) keeps running meanwhile.
+        An executor runs one batch at a time."""
+        import asyncio
+        return await asyncio.to_thread(self.execute_batch, inputs)
+
+    def _run(self, input):
+        """Run the target on the input while tracing it, without updating the cumulative coverage.
+        Return the number of exceptions and the execution time."""
         exceptions = 0
+        self.last_exception = None
+        self._input_coverage.clear()
+        if self.edge_map is not None:
+            self.edge_map.reset()
         try:
-            sys.settrace(self.trace_function)
-            start_time = time.time()
+            self._start_tracing()
+            start_time = time.perf_counter()
             # print(f"Input to be executed: {input}")
-            output = self.program_module(input)
-            end_time = time.time()
+            self.last_output = self.program_module(input)
+            end_time = time.perf_counter()
             execution_time = end_time - start_time
-            sys.settrace(None)
+            self._stop_tracing()
         except Exception as e:
             exceptions += 1
-            end_time = time.time()
+            self.last_output = None
+            self.last_exception = e
+            end_time = time.perf_counter()
             execution_time = end_time - start_time
-            sys.settrace(None)
+            self._stop_tracing()
+        return exceptions, execution_time
+
+    def _run_untraced(self, input) -> float:
+        """Run the target without tracing and return the execution time."""
+        start_time = time.perf_counter()
+        try:
+            self.program_module(input)
+        except Exception:
+            pass
+        return time.perf_counter() - start_time
+
+    def tracing_overhead(self) -> float | None:
+        """Share of the traced execution time due to tracing, over the sampled inputs."""
+        if self._sampled_traced_time <= 0:
+            return None
+        return max(0.0, 1 - self._sampled_untraced_time / self._sampled_traced_time)
+
+    @property
+    def coverage(self) -> set:
+        """Lines covered by all the inputs executed so far."""
+        return self._coverage
+
+    @property
+    def input_coverage(self) -> set:
+        """Lines covered by the last executed input."""
+        return self._input_coverage
 
-        self._coverage = set(self._full_coverage)
+    def executions_per_second(self) -> float:
+        """Number of traced executions per second of target time."""
+        if self.total_execution_time == 0:
+            return 0.0
+        return self.executions / self.total_execution_time
 
-        return exceptions, execution_time, self._coverage
+    def _start_tracing(self):
+        if self._tracer is None:
+            sys.settrace(self.trace_function)
+        else:
+            self._tracer.start()
+
+    def _stop_tracing(self):
+        if self._tracer is None:
+            sys.settrace(None)
+        else:
+            self._tracer.stop()
+
+    def _is_target(self, code_obj) -> bool:
+        """Check once per code object if it belongs to the desired module."""
+        try:
+            return self._target_cache[code_obj]
+        except KeyError:
+            module = inspect.getmodule(code_obj)
+            is_target = module is not None and (
+                self.module_name in code_obj.co_filename or self.func_name == module.__name__
+            )
+            self._target_cache[code_obj] = is_target
+            return is_target
 
     def trace_function(self, frame, event, arg):
 
@@ -55,6 +206,6 @@ class AbstractExecutor:
                 if self.module_name in filename or self.func_name == module_name:
 
                     # Add the executed line to the set
-                    self._full_coverage.append(line_number)
+                    self._input_coverage.add(line_number)
 
         return self.trace_function
@@ -1,17 +1,23 @@
 import random
 import re
 
+from poly_fuzzer.common.compiled_grammar import CompiledGrammar
+
 
 
 class AbstractGrammar:
     """
     # The `AbstractGrammar` class is used to generate strings based on a given grammar.
-    Code partially taken from https://www.fuzzingbook.org/html/Grammars.html#"""
+    Code partially taken from https://www.fuzzingbook.org/html/Grammars.html#
+    Generation is done by a `CompiledGrammar` built once from the grammar."""
 
-    def __init__(self, gram: dict):
+    def __init__(self, gram: dict, rng: random.Random | None = None):
         self.START_SYMBOL = "<start>"
         self.RE_NONTERMINAL = re.compile(r"(<[^<> ]*>)")
         self.gram = gram
+        self.rng = rng if rng is not None else random.Random()
+        # Expansions are tokenized once, generation works on derivation trees
+        self.compiled = CompiledGrammar(gram)
 
     def is_nonterminal(self, s):
         return self.RE_NONTERMINAL.match(s)
@@ -35,34 +41,18 @@ class AbstractGrammar:
         `start_symbol`: use a start symbol other than `<start>` (default).
         `max_nonterminals`: the maximum number of nonterminals
             still left for expansion
-        `max_expansion_trials`: maximum # of attempts to produce a string
+        `max_expansion_trials`: kept for compatibility, generation always terminates
+            by falling back to the cheapest expansions
         `log`: print expansion progress if True"""
 
-        term = start_symbol
-        expansion_trials = 0
-        grammar = self.gram
-
-        while len(self.nonterminals(term)) > 0:
-            symbol_to_expand = random.choice(self.nonterminals(term))
-            expansions = grammar[symbol_to_expand]
-            expansion = random.choice(expansions)
-            # In later chapters, we allow expansions to be tuples,
-            # with the expansion being the first element
-            if isinstance(expansion, tuple):
-                expansion = expansion[0]
-
-            new_term = term.replace(symbol_to_expand, expansion, 1)
-
-            if len(self.nonterminals(new_term)) < max_nonterminals:
-                term = new_term
-                if log:
-                    print("%-40s" % (symbol_to_expand + " -> " + expansion), term)
-                expansion_trials = 0
-            else:
-                expansion_trials += 1
-                if expansion_trials >= max_expansion_trials:
-                    print("Cannot expand " + repr(term))
-
-        return term
-
+        return self.compiled.to_string(self.generate_tree(start_symbol, max_nonterminals, log=log))
 
+    def generate_tree(
+        self,
+        start_symbol="<start>",
+        max_nonterminals: int = 10,
+        max_expansions: int = 1000,
+        log: bool = False,
+    ) -> list:
+        """Produce a derivation tree from `grammar`, see `CompiledGrammar`."""
+        return self.compiled.generate_tree(self.rng, start_symbol, max_nonterminals, max_expansions, log)
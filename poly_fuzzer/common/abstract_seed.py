@@ -10,6 +10,12 @@ class AbstractSeed:
         # These will be needed for advanced power schedules
         self.coverage = 0
         self.energy = 0.0
+        self.path_hash = None
+        self.exec_time = 0.0
+        # Number of seeds found by mutating this seed
+        self.discoveries = 0
+        # Derivation tree of the data, when it was produced from a grammar
+        self.tree = None
 
     def __str__(self) -> str:
         """Returns data as string representation of the seed"""
@@ -0,0 +1,67 @@
+import time
+
+
+class Budget:
+    """
+    # The `Budget` class decides when a fuzzing campaign stops.
+    A campaign stops after `executions` inputs, after `seconds` of wall-clock time, or once coverage
+    stopped growing for `plateau_executions` inputs or `plateau_seconds` seconds, whichever comes first.
+    Limits left to None do not apply. `stop_reason` tells which limit stopped the last run.
+    """
+
+    def __init__(
+            self,
+            executions: int | None = None,
+            seconds: float | None = None,
+            plateau_executions: int | None = None,
+            plateau_seconds: float | None = None,
+        ) -> None:
+        assert any(limit is not None for limit in (executions, seconds, plateau_executions, plateau_seconds)), \
+            "Error: The budget has no limit."
+        self.executions = executions
+        self.seconds = seconds
+        self.plateau_executions = plateau_executions
+        self.plateau_seconds = plateau_seconds
+        self.start()
+
+    def start(self):
+        """Reset the budget at the beginning of a run."""
+        self.executed = 0
+        self.start_time = time.perf_counter()
+        self._last_new_coverage = 0
+        self._last_new_coverage_time = self.start_time
+        self.stop_reason: str | None = None
+
+    def record(self, new_coverage: bool):
+        """Count one execution."""
+        self.executed += 1
+        if new_coverage:
+            self._last_new_coverage = self.executed
+            if self.plateau_seconds is not None:
+                self._last_new_coverage_time = time.perf_counter()
+
+    def exhausted(self) -> bool:
+        if self.executions is not None and self.executed >= self.executions:
+            self.stop_reason = "executions"
+        elif self.plateau_executions is not None and self.executed - self._last_new_coverage >= self.plateau_executions:
+            self.stop_reason = "plateau_executions"
+        elif self.seconds is not None or self.plateau_seconds is not None:
+            now = time.perf_counter()
+            if self.seconds is not None and now - self.start_time >= self.seconds:
+                self.stop_reason = "seconds"
+            elif self.plateau_seconds is not None and now - self._last_new_coverage_time >= self.plateau_seconds:
+                self.stop_reason = "plateau_seconds"
+        return self.stop_reason is not None
+
+    def remaining(self, default: int) -> int:
+        """Number of executions left, or `default` when the number of executions is not limited."""
+        if self.executions is None:
+            return default
+        return max(0, self.executions - self.executed)
+
+
+def as_budget(budget: "int | Budget") -> Budget:
+    """A number of executions is the budget of the original `run_fuzzer(budget)`."""
+    if isinstance(budget, Budget):
+        return budget
+    return Budget(executions=budget)
@@ -0,0 +1,110 @@
+import json
+import os
+import sys
+import time
+
+
+class CampaignStats:
+    """
+    # The `CampaignStats` class collects where a fuzzing campaign spends its time.
+    The fuzzer adds the `perf_counter_ns` duration of each phase (generate, schedule, mutate, execute,
+    update) and counts executions, new coverage events and exceptions. Every `interval` seconds,
+    a snapshot of the statistics is passed to each callback (see `stats_line` and `FuzzerStatsFile`).
+    Phases can be nested: schedule and mutate are part of generate.
+    """
+
+    # The clock is only read every CHECK_EVERY executions
+    CHECK_EVERY = 64
+
+    def __init__(self, interval: float = 5.0, callbacks: list | None = None) -> None:
+        self.interval = interval
+        self.callbacks = list(callbacks or [])
+        self.start()
+
+    def start(self, executor=None):
+        """Reset the statistics at the beginning of a run."""
+        self.phase_ns: dict[str, int] = {}
+        self.executions = 0
+        self.new_coverage_events = 0
+        self.exceptions = 0
+        self.start_time = time.perf_counter()
+        self._target_time_start = getattr(executor, "total_execution_time", 0.0)
+        self._next_report = self.start_time + self.interval
+
+    def add(self, phase: str, duration_ns: int):
+        self.phase_ns[phase] = self.phase_ns.get(phase, 0) + duration_ns
+
+    def count(self, exceptions: int, new_coverage: bool):
+        """Count one execution. Return True when the periodic report is due."""
+        self.executions += 1
+        self.exceptions += exceptions
+        if new_coverage:
+            self.new_coverage_events += 1
+        if self.callbacks and self.executions % self.CHECK_EVERY == 0:
+            now = time.perf_counter()
+            if now >= self._next_report:
+                self._next_report = now + self.interval
+                return True
+        return False
+
+    def snapshot(self, fuzzer) -> dict:
+        """Statistics of the run so far."""
+        run_time = time.perf_counter() - self.start_time
+        executor = fuzzer.executor
+        phases = dict(self.phase_ns)
+        # Time spent in the target itself, the rest of `execute` is tracing and coverage bookkeeping
+        phases["target"] = int((getattr(executor, "total_execution_time", 0.0) - self._target_time_start) * 1e9)
+        return {
+            "run_time": run_time,
+            "executions": self.executions,
+            "execs_per_sec": self.executions / run_time if run_time > 0 else 0.0,
+            "coverage": len(executor.coverage),
+            "corpus_size": fuzzer._corpus_size(),
+            "new_coverage_events": self.new_coverage_events,
+            "exceptions": self.exceptions,
+            "crash_buckets": {bucket.signature: bucket.count for bucket in fuzzer.triage.buckets.values()},
+            "tracing_overhead": executor.tracing_overhead() if hasattr(executor, "tracing_overhead") else None,
+            "phases": {
+                phase: {
+                    "seconds": ns / 1e9,
+                    "us_per_exec": ns / 1e3 / self.executions if self.executions else 0.0,
+                    "share": ns / 1e9 / run_time if run_time > 0 else 0.0,
+                }
+                for phase, ns in phases.items()
+            },
+        }
+
+    def report(self, fuzzer):
+        """Pass a snapshot to every callback."""
+        snapshot = self.snapshot(fuzzer)
+        for callback in self.callbacks:
+            callback(snapshot)
+
+
+def stats_line(stream=None):
+    """Callback printing a one-line summary of each snapshot."""
+    def callback(snapshot: dict):
+        phases = " ".join(
+            f"{phase}={values['share']:.0%}" for phase, values in snapshot["phases"].items()
+        )
+        print(
+            f"[{snapshot['run_time']:8.1f}s] execs={snapshot['executions']} "
+            f"({snapshot['execs_per_sec']:.0f}/s) cov={snapshot['coverage']} corpus={snapshot['corpus_size']} "
+            f"new={snapshot['new_coverage_events']} exc={snapshot['exceptions']} "
+            f"buckets={len(snapshot['crash_buckets'])} {phases}",
+            file=stream or sys.stderr,
+        )
+    return callback
+
+
+class FuzzerStatsFile:
+    """Callback keeping the last snapshot in a JSON file, like the `fuzzer_stats` file of AFL."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def __call__(self, snapshot: dict):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,176 @@
+import math
+import random
+import re
+
+
+RE_NONTERMINAL = re.compile(r"(<[^<> ]*>)")
+
+
+class CompiledGrammar:
+    """
+    # The `CompiledGrammar` class is a pre-tokenized version of a grammar used to generate derivation trees.
+    Every expansion is split once into a tuple of symbol ids (nonterminals) and strings (terminals),
+    and the minimal cost to fully expand each nonterminal is computed up front. Generation then expands
+    the open nonterminals from a stack, picking expansions at random while they cannot exceed
+    `max_nonterminals` and the cheapest ones otherwise. After `max_expansions` steps only the cheapest
+    expansions are used: each of them lowers the total cost of the open nonterminals, so generation
+    always terminates.
+
+    A derivation tree node is a list `[symbol_id, children]`, the children being nodes or terminal strings.
+    """
+
+    def __init__(self, gram: dict):
+        self.symbols: list[str] = list(gram)
+        self.symbol_ids: dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.expansions: list[list[tuple]] = [
+            [self._tokenize(expansion) for expansion in gram[symbol]] for symbol in self.symbols
+        ]
+        # Number of nonterminals of each expansion
+        self.arity: list[list[int]] = [
+            [sum(isinstance(token, int) for token in expansion) for expansion in expansions]
+            for expansions in self.expansions
+        ]
+        self.max_arity: list[int] = [max(arity, default=0) for arity in self.arity]
+        self.cost = self._compute_costs()
+        # Expansions reaching the minimal cost of each symbol
+        self.cheapest: list[list[int]] = [
+            [
+                i for i, expansion in enumerate(expansions)
+                if self._expansion_cost(expansion) == self.cost[symbol_id]
+            ]
+            for symbol_id, expansions in enumerate(self.expansions)
+        ]
+
+    def _tokenize(self, expansion) -> tuple:
+        # In later chapters, we allow expansions to be tuples,
+        # with the expansion being the first element
+        if isinstance(expansion, tuple):
+            expansion = expansion[0]
+        tokens = []
+        for part in RE_NONTERMINAL.split(expansion):
+            if not part:
+                continue
+            if part in self.symbol_ids:
+                tokens.append(self.symbol_ids[part])
+            elif tokens and isinstance(tokens[-1], str):
+                # Merge adjacent terminals (undefined <symbols> are kept as text)
+                tokens[-1] += part
+            else:
+                tokens.append(part)
+        return tuple(tokens)
+
+    def _expansion_cost(self, expansion: tuple) -> float:
+        return 1 + sum(self.cost[token] for token in expansion if isinstance(token, int))
+
+    def _compute_costs(self) -> list[float]:
+        """Minimal number of expansions to turn each symbol into terminals (fixpoint)."""
+        self.cost = [math.inf] * len(self.symbols)
+        changed = True
+        while changed:
+            changed = False
+            for symbol_id, expansions in enumerate(self.expansions):
+                best = min((self._expansion_cost(expansion) for expansion in expansions), default=math.inf)
+                if best < self.cost[symbol_id]:
+                    self.cost[symbol_id] = best
+                    changed = True
+        for symbol, cost in zip(self.symbols, self.cost):
+            if cost == math.inf:
+                raise ValueError(f"The symbol {symbol} can never be fully expanded.")
+        return self.cost
+
+    def expand(
+        self,
+        node: list,
+        rng: random.Random,
+        max_nonterminals: int = 10,
+        open_nonterminals: int = 1,
+        max_expansions: int = 1000,
+        log: bool = False,
+    ):
+        """Expand `node` (and all its descendants) in place.
+        `open_nonterminals` is the number of nonterminals still to expand, `node` included."""
+        stack = [node]
+        expansions = 0
+        while stack:
+            current = stack.pop()
+            symbol_id = current[0]
+            arity = self.arity[symbol_id]
+            if (
+                open_nonterminals - 1 + self.max_arity[symbol_id] < max_nonterminals
+                and expansions < max_expansions
+            ):
+                choice = rng.randrange(len(arity))
+            else:
+                choice = rng.choice(self.cheapest[symbol_id])
+            expansions += 1
+            expansion = self.expansions[symbol_id][choice]
+
+            children = [[token, None] if isinstance(token, int) else token for token in expansion]
+            current[1] = children
+            open_nonterminals += arity[choice] - 1
+            if log:
+                print("%-40s" % (self.symbols[symbol_id] + " -> " + self.to_string(current, partial=True)))
+            # Push in reverse order so the leftmost nonterminal is expanded first
+            stack.extend(child for child in reversed(children) if isinstance(child, list))
+        return node
+
+    def generate_tree(
+        self,
+        rng: random.Random,
+        start_symbol: str = "<start>",
+        max_nonterminals: int = 10,
+        max_expansions: int = 1000,
+        log: bool = False,
+    ) -> list:
+        """Return a random derivation tree of `start_symbol`."""
+        return self.expand(
+            [self.symbol_ids[start_symbol], None], rng, max_nonterminals,
+            max_expansions=max_expansions, log=log,
+        )
+
+    def subtrees(self, tree: list) -> list[tuple[tuple[int, ...], list]]:
+        """Return the (path, node) of every nonterminal node of a tree,
+        the path being the indices of the children to follow from the root."""
+        subtrees = []
+        stack = [((), tree)]
+        while stack:
+            path, node = stack.pop()
+            subtrees.append((path, node))
+            if node[1] is not None:
+                for i, child in enumerate(node[1]):
+                    if isinstance(child, list):
+                        stack.append((path + (i,), child))
+        return subtrees
+
+    def replace(self, tree: list, path: tuple[int, ...], subtree: list) -> list:
+        """Return a tree where the node at `path` is replaced by `subtree`.
+        Only the nodes along the path are copied, the rest is shared with `tree`,
+        so trees must not be modified in place once built."""
+        if not path:
+            return subtree
+        root = [tree[0], list(tree[1])]
+        copy = root
+        for i in path[:-1]:
+            child = copy[1][i]
+            child = [child[0], list(child[1])]
+            copy[1][i] = child
+            copy = child
+        copy[1][path[-1]] = subtree
+        return root
+
+    def to_string(self, tree: list, partial: bool = False) -> str:
+        """Concatenate the terminals of a derivation tree.
+        With `partial`, unexpanded nonterminals are written as their symbol."""
+        parts = []
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            elif node[1] is None:
+                if not partial:
+                    raise ValueError("The derivation tree is not fully expanded.")
+                parts.append(self.symbols[node[0]])
+            else:
+                stack.extend(reversed(node[1]))
+        return "".join(parts)
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import time
+
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+
+
+class CorpusStore:
+    """
+    # The `CorpusStore` class keeps a fuzzing corpus on disk so campaigns survive restarts.
+    Each seed is written once in `queue/`, named after the SHA-1 of its content, and described by a line
+    of the append-only `index.jsonl`: covered lines, path hash, execution time and derivation tree.
+    Duplicates are detected by content hash and never stored twice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.queue_dir = os.path.join(path, "queue")
+        self.index_path = os.path.join(path, "index.jsonl")
+        os.makedirs(self.queue_dir, exist_ok=True)
+        # Metadata of each seed, by content hash, in insertion order
+        self.entries: dict[str, dict] = {}
+        self._load_index()
+
+    @staticmethod
+    def _encode(data: str) -> bytes:
+        return data.encode("utf-8", "surrogatepass")
+
+    @staticmethod
+    def content_hash(data: str) -> str:
+        return hashlib.sha1(CorpusStore._encode(data)).hexdigest()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line cut by a crash
+                    continue
+                if os.path.exists(os.path.join(self.queue_dir, entry["id"])):
+                    self.entries[entry["id"]] = entry
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, data: str) -> bool:
+        return self.content_hash(data) in self.entries
+
+    def add(self, seed: AbstractSeed, lines: set | None = None) -> bool:
+        """Store `seed` and the lines it covers. Return False if it was already stored."""
+        content_hash = self.content_hash(seed.data)
+        if content_hash in self.entries:
+            return False
+
+        # The data is in place before the index references it
+        path = os.path.join(self.queue_dir, content_hash)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._encode(seed.data))
+        os.replace(tmp_path, path)
+
+        entry = {
+            "id": content_hash,
+            "length": len(seed.data),
+            "lines": sorted(lines) if lines is not None else None,
+            "coverage": seed.coverage,
+            "path_hash": seed.path_hash,
+            "exec_time": seed.exec_time,
+            "tree": seed.tree,
+            "time": time.time(),
+        }
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.entries[content_hash] = entry
+        return True
+
+    def load_seeds(self) -> list[AbstractSeed]:
+        """Return the stored seeds with their metadata."""
+        seeds = []
+        for content_hash, entry in self.entries.items():
+            with open(os.path.join(self.queue_dir, content_hash), "rb") as f:
+                seed = AbstractSeed(f.read().decode("utf-8", "surrogatepass"))
+            seed.coverage = entry["coverage"]
+            seed.path_hash = entry["path_hash"]
+            seed.exec_time = entry["exec_time"]
+            seed.tree = entry["tree"]
+            seeds.append(seed)
+        return seeds
+
+    def lines(self, content_hash: str) -> set | None:
+        """Lines covered by a stored seed, if they were recorded."""
+        lines = self.entries[content_hash]["lines"]
+        return set(lines) if lines is not None else None
+
+    def coverage(self) -> set:
+        """Lines covered by the whole corpus."""
+        covered = set()
+        for entry in self.entries.values():
+            if entry["lines"] is not None:
+                covered.update(entry["lines"])
+        return covered
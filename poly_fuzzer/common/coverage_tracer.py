@@ -0,0 +1,123 @@
+import sys
+
+
+class SettraceTracer:
+    """
+    # The `SettraceTracer` class collects the executed lines of the target module with `sys.settrace`.
+    Only frames whose code object belongs to the target get a local tracer, every other frame
+    runs with `f_trace = None` and therefore produces no `line` events at all.
+    """
+
+    def __init__(self, is_target, record, edges=None):
+        # `is_target(code)` decides (and caches) whether a code object belongs to the target
+        # `record(line_number)` stores an executed line
+        # `edges` is an optional `EdgeCoverageMap` also fed with every executed line
+        self.is_target = is_target
+        self.record = record
+        self.edges = edges
+
+    def start(self):
+        sys.settrace(self._global_trace)
+
+    def stop(self):
+        sys.settrace(None)
+
+    def _global_trace(self, frame, event, arg):
+        # Only called on `call` events, returning None disables line tracing for the frame
+        if self.is_target(frame.f_code):
+            return self._local_trace if self.edges is None else self._local_trace_edges
+        return None
+
+    def _local_trace(self, frame, event, arg):
+        if event == "line":
+            self.record(frame.f_lineno)
+        return self._local_trace
+
+    def _local_trace_edges(self, frame, event, arg):
+        if event == "line":
+            self.record(frame.f_lineno)
+            self.edges.hit(frame.f_code, frame.f_lineno)
+        return self._local_trace_edges
+
+
+class MonitoringTracer:
+    """
+    # The `MonitoringTracer` class collects the executed lines of the target module with `sys.monitoring` (Python 3.12+).
+    `PY_START` is used to find the code objects of the target, `LINE` events are then enabled
+    locally on those code objects only. Each event is disabled as soon as it has been seen, so a
+    line costs a single callback per input however many times it is executed.
+    With an edge map, `LINE` events stay enabled since every transition has to be counted.
+    """
+
+    TOOL_NAME = "poly_fuzzer"
+
+    def __init__(self, is_target, record, edges=None):
+        if not hasattr(sys, "monitoring"):
+            raise RuntimeError("sys.monitoring requires Python 3.12 or later.")
+        self.is_target = is_target
+        self.record = record
+        self.edges = edges
+        self.tool_id = None
+        self._instrumented = set()
+
+    def start(self):
+        monitoring = sys.monitoring
+        self.tool_id = self._acquire_tool_id()
+        events = monitoring.events
+        monitoring.register_callback(self.tool_id, events.PY_START, self._on_start)
+        on_line = self._on_line if self.edges is None else self._on_line_edges
+        monitoring.register_callback(self.tool_id, events.LINE, on_line)
+        monitoring.set_events(self.tool_id, events.PY_START)
+        # Re-enable the events disabled during the previous input
+        monitoring.restart_events()
+
+    def stop(self):
+        monitoring = sys.monitoring
+        if self.tool_id is None:
+            return
+        events = monitoring.events
+        monitoring.set_events(self.tool_id, events.NO_EVENTS)
+        for code in self._instrumented:
+            monitoring.set_local_events(self.tool_id, code, events.NO_EVENTS)
+        self._instrumented.clear()
+        monitoring.register_callback(self.tool_id, events.PY_START, None)
+        monitoring.register_callback(self.tool_id, events.LINE, None)
+        monitoring.free_tool_id(self.tool_id)
+        self.tool_id = None
+
+    def _acquire_tool_id(self):
+        monitoring = sys.monitoring
+        candidates = [monitoring.COVERAGE_ID] + [
+            tool_id for tool_id in range(6) if tool_id != monitoring.COVERAGE_ID
+        ]
+        for tool_id in candidates:
+            if monitoring.get_tool(tool_id) is None:
+                monitoring.use_tool_id(tool_id, self.TOOL_NAME)
+                return tool_id
+        raise RuntimeError("No free sys.monitoring tool id.")
+
+    def _on_start(self, code, instruction_offset):
+        if code not in self._instrumented and self.is_target(code):
+            sys.monitoring.set_local_events(self.tool_id, code, sys.monitoring.events.LINE)
+            self._instrumented.add(code)
+        return sys.monitoring.DISABLE
+
+    def _on_line(self, code, line_number):
+        self.record(line_number)
+        return sys.monitoring.DISABLE
+
+    def _on_line_edges(self, code, line_number):
+        self.record(line_number)
+        self.edges.hit(code, line_number)
+
+
+def make_tracer(backend: str, is_target, record, edges=None):
+    """Create the tracer for `backend`: "settrace", "monitoring" or "auto"
+    (`sys.monitoring` when available, `sys.settrace` otherwise)."""
+    if backend == "auto":
+        backend = "monitoring" if hasattr(sys, "monitoring") else "settrace"
+    if backend == "settrace":
+        return SettraceTracer(is_target, record, edges)
+    if backend == "monitoring":
+        return MonitoringTracer(is_target, record, edges)
+    raise ValueError(f"Unknown tracer backend: {backend}")
@@ -0,0 +1,126 @@
+import hashlib
+import os
+import traceback
+
+
+class RemoteException(Exception):
+    """An exception raised in another process (or a timeout or crash of that process),
+    rebuilt from its type name, message and stack frames."""
+
+    def __init__(self, exception_type: str, message: str, frames: list | None = None, traceback_text: str = "") -> None:
+        super().__init__(message)
+        self.exception_type = exception_type
+        # (file name, function, line) of each frame, outermost first
+        self.frames = frames or []
+        self.traceback_text = traceback_text or f"{exception_type}: {message}\n"
+
+
+def exception_type_name(exception: BaseException) -> str:
+    if isinstance(exception, RemoteException):
+        return exception.exception_type
+    return type(exception).__module__ + "." + type(exception).__qualname__
+
+
+def exception_frames(exception: BaseException) -> list[tuple[str, str, int]]:
+    """(file name, function, line) of the frames of the target, outermost first."""
+    if isinstance(exception, RemoteException):
+        return exception.frames
+    # The outermost frame is the executor calling the target
+    return [
+        (frame.filename, frame.name, frame.lineno)
+        for frame in traceback.extract_tb(exception.__traceback__)[1:]
+    ]
+
+
+def exception_details(exception: BaseException) -> tuple:
+    """Picklable description of an exception, rebuilt in another process with `RemoteException(*details)`."""
+    return (
+        exception_type_name(exception),
+        str(exception)[:1000],
+        exception_frames(exception),
+        "".join(traceback.format_exception(exception))[-10000:],
+    )
+
+
+class CrashBucket:
+    """Exceptions sharing the same signature, with the smallest input raising them."""
+
+    def __init__(self, signature: str, exception: BaseException, input: str, index: int) -> None:
+        self.signature = signature
+        self.exception_type = exception_type_name(exception)
+        self.message = str(exception)
+        if isinstance(exception, RemoteException):
+            self.traceback = exception.traceback_text
+        else:
+            self.traceback = "".join(traceback.format_exception(exception))
+        self.count = 1
+        # Index of the first input of the campaign raising this exception
+        self.first_index = index
+        self.reproducer = input
+
+
+class CrashTriage:
+    """
+    # The `CrashTriage` class deduplicates the exceptions raised by the target.
+    Each exception gets a signature: the hash of its type and of the innermost `max_frames` frames of its
+    traceback (file name, function and line, the message is left out as it often embeds the input).
+    Exceptions with the same signature fall in the same bucket, which only keeps a count and the smallest
+    reproducer. With `crash_dir`, the reproducer and traceback of each bucket are written to
+    `<crash_dir>/<signature>` and `<crash_dir>/<signature>.txt`.
+    """
+
+    def __init__(self, crash_dir: str | None = None, max_frames: int = 5) -> None:
+        self.crash_dir = crash_dir
+        self.max_frames = max_frames
+        self.buckets: dict[str, CrashBucket] = {}
+        self.total = 0
+        if crash_dir is not None:
+            os.makedirs(crash_dir, exist_ok=True)
+
+    def signature(self, exception: BaseException) -> str:
+        frames = exception_frames(exception)[-self.max_frames:]
+        parts = [exception_type_name(exception)]
+        parts.extend(f"{os.path.basename(filename)}:{name}:{lineno}" for filename, name, lineno in frames)
+        return hashlib.sha1("\n".join(parts).encode()).hexdigest()[:16]
+
+    def record(self, input: str, exception: BaseException, index: int = -1) -> bool:
+        """Add an exception raised by `input` to its bucket. Return True for a new bucket."""
+        self.total += 1
+        signature = self.signature(exception)
+        bucket = self.buckets.get(signature)
+        if bucket is None:
+            bucket = self.buckets[signature] = CrashBucket(signature, exception, input, index)
+            self._write(bucket, traceback=True)
+            return True
+
+        bucket.count += 1
+        if len(input) < len(bucket.reproducer):
+            bucket.reproducer = input
+            self._write(bucket)
+        return False
+
+    def _write(self, bucket: CrashBucket, traceback: bool = False):
+        if self.crash_dir is None:
+            return
+        path = os.path.join(self.crash_dir, bucket.signature)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(bucket.reproducer.encode("utf-8", "surrogatepass"))
+        os.replace(tmp_path, path)
+        if traceback:
+            with open(path + ".txt", "w", encoding="utf-8") as f:
+                f.write(bucket.traceback)
+
+    def summary(self) -> list[dict]:
+        """One line per bucket, the most frequent first."""
+        return [
+            {
+                "signature": bucket.signature,
+                "exception": bucket.exception_type,
+                "message": bucket.message,
+                "count": bucket.count,
+                "first_index": bucket.first_index,
+                "reproducer": bucket.reproducer,
+            }
+            for bucket in sorted(self.buckets.values(), key=lambda bucket: -bucket.count)
+        ]
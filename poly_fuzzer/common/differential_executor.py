@@ -0,0 +1,63 @@
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+
+
+class Divergence:
+    """An input on which the two implementations disagree.
+    Outcomes are `("output", value)` or `("exception", exception type name)`."""
+
+    def __init__(self, input, expected: tuple, actual: tuple) -> None:
+        self.input = input
+        self.expected = expected
+        self.actual = actual
+
+    def __repr__(self) -> str:
+        return f"Divergence({self.input!r}, expected={self.expected!r}, actual={self.actual!r})"
+
+
+class DifferentialExecutor(AbstractExecutor):
+    """
+    # The `DifferentialExecutor` class runs every input on a reference implementation and an alternative one.
+    The reference (`program_module`) is traced and guides the fuzzer as usual; `alternative` runs
+    untraced right after it. An input on which the outputs differ, or on which the implementations
+    do not raise the same exception type, is counted in `divergence_count` and the first
+    `max_divergences` of them are kept in `divergences`.
+    `known_differences` maps exception type names of the reference to the type the alternative raises
+    instead on purpose (e.g. `cgi_decode.KNOWN_DIFFERENCES`); these are not divergences.
+    """
+
+    def __init__(
+            self,
+            program_module,
+            alternative,
+            max_divergences: int = 100,
+            known_differences: dict[str, str] | None = None,
+            **kwargs,
+        ):
+        super().__init__(program_module, **kwargs)
+        self.alternative = alternative
+        self.known_differences = dict(known_differences or {})
+        self.max_divergences = max_divergences
+        self.divergences: list[Divergence] = []
+        self.divergence_count = 0
+        # Whether the last executed input diverged
+        self.last_divergence: Divergence | None = None
+
+    def _run(self, input):
+        exceptions, execution_time = super()._run(input)
+        if self.last_exception is not None:
+            name = type(self.last_exception).__name__
+            expected = ("exception", self.known_differences.get(name, name))
+        else:
+            expected = ("output", self.last_output)
+        try:
+            actual = ("output", self.alternative(input))
+        except Exception as e:
+            actual = ("exception", type(e).__name__)
+
+        self.last_divergence = None
+        if actual != expected:
+            self.last_divergence = Divergence(input, expected, actual)
+            self.divergence_count += 1
+            if len(self.divergences) < self.max_divergences:
+                self.divergences.append(self.last_divergence)
+        return exceptions, execution_time
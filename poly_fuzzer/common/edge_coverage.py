@@ -0,0 +1,73 @@
+import zlib
+
+import numpy as np
+
+
+# Bucket of each hit count, as done by AFL: 1, 2, 3, 4-7, 8-15, 16-31, 32-127, 128+
+COUNT_CLASS_LOOKUP = np.zeros(256, dtype=np.uint8)
+COUNT_CLASS_LOOKUP[1] = 1
+COUNT_CLASS_LOOKUP[2] = 2
+COUNT_CLASS_LOOKUP[3] = 4
+COUNT_CLASS_LOOKUP[4:8] = 8
+COUNT_CLASS_LOOKUP[8:16] = 16
+COUNT_CLASS_LOOKUP[16:32] = 32
+COUNT_CLASS_LOOKUP[32:128] = 64
+COUNT_CLASS_LOOKUP[128:] = 128
+
+
+class EdgeCoverageMap:
+    """
+    # The `EdgeCoverageMap` class is an AFL-style edge coverage bitmap.
+    Each (previous line, current line) transition is hashed into a fixed-size `bytearray` of hit counts.
+    After each input the hit counts are bucketed and compared in one vectorized operation
+    against the "virgin" map holding the buckets never seen so far.
+    """
+
+    def __init__(self, map_size: int = 1 << 16):
+        assert map_size & (map_size - 1) == 0, "The map size should be a power of two."
+        self.map_size = map_size
+        self._mask = map_size - 1
+        self.trace_bits = bytearray(map_size)
+        self._trace_view = np.frombuffer(self.trace_bits, dtype=np.uint8)
+        self._empty = bytes(map_size)
+        self.virgin_bits = np.full(map_size, 0xFF, dtype=np.uint8)
+        self._prev_location = 0
+        # Per code object location base, derived from its file name
+        self._code_ids = {}
+
+    def reset(self):
+        """Clear the hit counts before executing a new input."""
+        self.trace_bits[:] = self._empty
+        self._prev_location = 0
+
+    def hit(self, code, line_number):
+        """Record the transition from the previous line to `line_number` of `code`."""
+        try:
+            code_id = self._code_ids[code]
+        except KeyError:
+            code_id = zlib.crc32(code.co_filename.encode())
+            self._code_ids[code] = code_id
+        location = (code_id ^ (line_number * 0x9E3779B1)) & self._mask
+        index = location ^ self._prev_location
+        self._prev_location = location >> 1
+        count = self.trace_bits[index]
+        if count < 255:
+            self.trace_bits[index] = count + 1
+
+    def classified(self) -> np.ndarray:
+        """Hit counts of the last input, bucketed."""
+        return COUNT_CLASS_LOOKUP[self._trace_view]
+
+    def update_virgin(self) -> set:
+        """Merge the last input in the virgin map.
+        Return the indices of the map where the input reached a new edge or a new hit count bucket."""
+        classified = self.classified()
+        novel = classified & self.virgin_bits
+        if not novel.any():
+            return set()
+        self.virgin_bits &= ~classified
+        return set(np.flatnonzero(novel).tolist())
+
+    def count_edges(self) -> int:
+        """Number of edges seen so far."""
+        return int(np.count_nonzero(self.virgin_bits != 0xFF))
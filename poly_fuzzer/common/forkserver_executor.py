@@ -0,0 +1,218 @@
+import inspect
+import mmap
+import os
+import pickle
+import resource
+import select
+import signal
+import struct
+import sys
+import tempfile
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.crash_triage import RemoteException, exception_details
+
+
+# Status sent by the fork server after each input
+_FINISHED = 0
+_TIMEOUT = 1
+_KILLED = 2
+
+_LENGTH = struct.Struct("<I")
+_STATUS = struct.Struct("<ii")
+# Length written in the shared memory when the results went to the overflow file
+_OVERFLOW = 0xFFFFFFFF
+# Exit status of a child that ran the target but failed to report its results
+_EXECUTOR_ERROR = 3
+
+
+class ForkserverExecutor(AbstractExecutor):
+    """
+    # The `ForkserverExecutor` class runs every input in a forked child process, as the AFL fork server does.
+    A small server process is forked once the target is imported; for each input it forks a child that
+    starts tracing, runs the target and writes its results (execution time, covered lines, edge map
+    and exception) to an anonymous shared memory region, then exits. Results larger than
+    `shared_memory_size` go through a temporary file instead.
+    A child running longer than `timeout` seconds is killed, `memory_limit` (in MB) caps its address space.
+    Hangs, hard crashes and leaked target state therefore never reach the fuzzer: timeouts and crashes
+    are reported as exceptions (see `RemoteException`) and end up in the crash triage.
+    """
+
+    def __init__(
+        self,
+        program_module,
+        timeout: float = 1.0,
+        memory_limit: int | None = None,
+        shared_memory_size: int = 1 << 20,
+        **kwargs,
+    ):
+        super().__init__(program_module, **kwargs)
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        map_size = self.edge_map.map_size if self.edge_map is not None else 0
+        # Edge map first, then the pickled results
+        self._shared = mmap.mmap(-1, map_size + shared_memory_size)
+        self._results_offset = map_size
+        self._overflow = tempfile.TemporaryFile()
+        self.timeouts = 0
+        self.crashes = 0
+        self._server_pid = None
+        self._start_server()
+
+    def _start_server(self):
+        request_read, self._request_write = os.pipe()
+        self._status_read, status_write = os.pipe()
+        # Buffered output would be written again by every child
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            os.close(self._request_write)
+            os.close(self._status_read)
+            try:
+                self._serve(request_read, status_write)
+            finally:
+                os._exit(0)
+        os.close(request_read)
+        os.close(status_write)
+        self._server_pid = pid
+
+    def _serve(self, request_read: int, status_write: int):
+        """Loop of the server process: one child per input, until the request pipe is closed."""
+        self._prime_target_cache()
+        with os.fdopen(request_read, "rb") as requests:
+            while True:
+                header = requests.read(_LENGTH.size)
+                if len(header) < _LENGTH.size:
+                    return
+                (length,) = _LENGTH.unpack(header)
+                input = requests.read(length).decode("utf-8", "surrogatepass")
+
+                done_read, done_write = os.pipe()
+                pid = os.fork()
+                if pid == 0:
+                    os.close(done_read)
+                    os.close(requests.fileno())
+                    self._run_child(input)
+                os.close(done_write)
+                # The pipe is closed (readable) as soon as the child exits, whatever the cause
+                ready, _, _ = select.select([done_read], [], [], self.timeout)
+                os.close(done_read)
+                if ready:
+                    _, wait_status = os.waitpid(pid, 0)
+                    kind = _FINISHED if os.WIFEXITED(wait_status) and os.WEXITSTATUS(wait_status) == 0 else _KILLED
+                else:
+                    os.kill(pid, signal.SIGKILL)
+                    _, wait_status = os.waitpid(pid, 0)
+                    kind = _TIMEOUT
+                os.write(status_write, _STATUS.pack(kind, wait_status))
+
+    def _prime_target_cache(self):
+        """Decide once, in the server, which code objects of the target module are traced.
+        Children inherit the decisions instead of paying for `inspect.getmodule` on every input."""
+        module = inspect.getmodule(self.program_module)
+        for value in vars(module).values():
+            code = getattr(value, "__code__", None)
+            if code is not None:
+                self._is_target(code)
+
+    def _run_child(self, input):
+        """Run one input in the child process and exit."""
+        try:
+            if self.memory_limit is not None:
+                limit = self.memory_limit * 1024 * 1024
+                resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+            _, execution_time = self._run(input)
+        except BaseException:
+            os._exit(1)
+        try:
+            exception = exception_details(self.last_exception) if self.last_exception is not None else None
+            results = pickle.dumps((execution_time, self._input_coverage, exception))
+            if self.edge_map is not None:
+                self._shared[:self._results_offset] = self.edge_map.trace_bits
+            offset = self._results_offset
+            if _LENGTH.size + len(results) <= len(self._shared) - offset:
+                self._shared[offset:offset + _LENGTH.size + len(results)] = _LENGTH.pack(len(results)) + results
+            else:
+                fd = self._overflow.fileno()
+                os.ftruncate(fd, 0)
+                os.pwrite(fd, results, 0)
+                self._shared[offset:offset + _LENGTH.size] = _LENGTH.pack(_OVERFLOW)
+        except BaseException:
+            os._exit(_EXECUTOR_ERROR)
+        os._exit(0)
+
+    def _execute_input(self, input):
+        """Execute the input in a child process, same results as `AbstractExecutor._execute_input`."""
+        assert self._server_pid is not None, "Error: the fork server is closed."
+        data = input.encode("utf-8", "surrogatepass")
+        os.write(self._request_write, _LENGTH.pack(len(data)) + data)
+        kind, wait_status = _STATUS.unpack(self._read_status())
+
+        self.last_exception = None
+        self._input_coverage.clear()
+        if self.edge_map is not None:
+            self.edge_map.reset()
+        if kind == _FINISHED:
+            offset = self._results_offset
+            (length,) = _LENGTH.unpack(self._shared[offset:offset + _LENGTH.size])
+            offset += _LENGTH.size
+            if length == _OVERFLOW:
+                fd = self._overflow.fileno()
+                results = os.pread(fd, os.fstat(fd).st_size, 0)
+            else:
+                results = self._shared[offset:offset + length]
+            execution_time, lines, exception = pickle.loads(results)
+            self._input_coverage |= lines
+            if self.edge_map is not None:
+                self.edge_map.trace_bits[:] = self._shared[:self._results_offset]
+            if exception is not None:
+                self.last_exception = RemoteException(*exception)
+        elif os.WIFEXITED(wait_status) and os.WEXITSTATUS(wait_status) == _EXECUTOR_ERROR:
+            raise RuntimeError("Error: the fork server child could not report the results of the input.")
+        elif kind == _TIMEOUT:
+            self.timeouts += 1
+            execution_time = self.timeout
+            self.last_exception = RemoteException("Timeout", f"No result after {self.timeout} s")
+        else:
+            self.crashes += 1
+            execution_time = 0.0
+            if os.WIFSIGNALED(wait_status):
+                message = f"Killed by signal {signal.Signals(os.WTERMSIG(wait_status)).name}"
+            else:
+                message = f"Exited with status {os.WEXITSTATUS(wait_status)}"
+            self.last_exception = RemoteException("Crash", message)
+
+        self.executions += 1
+        self.total_execution_time += execution_time
+        new_coverage = self._input_coverage - self._coverage
+        self._coverage |= new_coverage
+        if self.edge_map is not None:
+            new_coverage = self.edge_map.update_virgin()
+
+        return int(self.last_exception is not None), execution_time, new_coverage
+
+    def _read_status(self) -> bytes:
+        status = b""
+        while len(status) < _STATUS.size:
+            chunk = os.read(self._status_read, _STATUS.size - len(status))
+            if not chunk:
+                raise RuntimeError("Error: the fork server stopped.")
+            status += chunk
+        return status
+
+    def close(self):
+        """Stop the fork server."""
+        if self._server_pid is None:
+            return
+        os.close(self._request_write)
+        os.close(self._status_read)
+        os.waitpid(self._server_pid, 0)
+        self._server_pid = None
+        self._overflow.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
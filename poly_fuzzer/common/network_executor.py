@@ -0,0 +1,248 @@
+import multiprocessing
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor, ExecutionResult
+from poly_fuzzer.common.crash_triage import RemoteException, exception_details
+
+
+class TargetRequestHandler(BaseHTTPRequestHandler):
+    """
+    # The `TargetRequestHandler` class is a CGI-like HTTP endpoint in front of the target.
+    `POST /` runs the target on the request body (a form-encoded query string for `cgi_decode`)
+    and answers 200 with the output, or 500 when the target raises. Connections are kept alive
+    and requests are answered in order, so clients can pipeline them.
+    Coverage never goes in the response: the server sends `(request id, execution time, lines, exception)`
+    over the results connection of the fuzzer.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Small responses must not wait for the acknowledgement of the previous ones
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        input = body.decode("utf-8", "surrogatepass")
+        # Coverage is collected for one request at a time
+        with server.lock:
+            server.running.value = int(self.headers.get("X-Fuzz-Id", -1))
+            exceptions, execution_time = server.executor._run(input)
+            exception = server.executor.last_exception
+            server.results.send((
+                self.headers.get("X-Fuzz-Id"), execution_time, frozenset(server.executor.input_coverage),
+                exception_details(exception) if exception is not None else None,
+            ))
+            server.running.value = -1
+        if exception is None:
+            status, output = 200, str(server.executor.last_output).encode("utf-8", "surrogatepass")
+        else:
+            status, output = 500, type(exception).__name__.encode()
+        self.send_response_only(status)
+        self.send_header("Content-Length", str(len(output)))
+        self.end_headers()
+        self.wfile.write(output)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve_target(program_module, results, running, tracer: str):
+    """Entry point of the server process."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TargetRequestHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.results = results
+    # Id of the request running the target (-1: none), to find the input that hangs after a timeout
+    server.running = running
+    server.executor = AbstractExecutor(program_module, tracer=tracer)
+    results.send(server.server_address[1])
+    server.serve_forever()
+
+
+class _Connection:
+    """A keep-alive connection to the server, reading responses from a buffered file."""
+
+    def __init__(self, port: int, timeout: float) -> None:
+        self.sock = socket.create_connection(("127.0.0.1", port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rfile = self.sock.makefile("rb")
+
+    def send(self, requests: list[tuple[int, bytes]]):
+        """Write several requests at once (pipelining)."""
+        self.sock.sendall(b"".join(
+            b"POST / HTTP/1.1\r\nHost: localhost\r\nX-Fuzz-Id: %d\r\nContent-Length: %d\r\n\r\n%s"
+            % (request_id, len(body), body)
+            for request_id, body in requests
+        ))
+
+    def read_response(self) -> int:
+        """Read one response and return its status.
+        Raise `ConnectionError` when the server closed the connection (e.g. the target crashed it)."""
+        fields = self.rfile.readline().split(None, 2)
+        if len(fields) < 2 or not fields[1].isdigit():
+            raise ConnectionError("The target server closed the connection.")
+        status = int(fields[1])
+        length = 0
+        while True:
+            line = self.rfile.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.partition(b":")
+            if name.lower() == b"content-length":
+                length = int(value)
+        self.rfile.read(length)
+        return status
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+
+class NetworkExecutor(AbstractExecutor):
+    """
+    # The `NetworkExecutor` class fuzzes a target through a local HTTP server stand-in.
+    The server runs in its own process (see `TargetRequestHandler`) and traces the target itself.
+    Inputs are posted over `n_connections` keep-alive connections, `pipeline_depth` requests in flight
+    per connection, and the lines covered by each request come back over a separate results pipe.
+    Single inputs go through the first connection; `execute_batch` spreads the batch over the whole pool.
+    A response taking more than `timeout` seconds means the target hangs: the input running in the server
+    is reported as a `Timeout`, the server is restarted and the other unanswered inputs are sent again.
+    An input killing the server is reported as a `Crash` the same way.
+    """
+
+    def __init__(
+            self,
+            program_module,
+            n_connections: int = 4,
+            pipeline_depth: int = 32,
+            tracer: str = "auto",
+            timeout: float = 1.0,
+        ):
+        super().__init__(program_module, tracer=tracer)
+        self.n_connections = n_connections
+        self.pipeline_depth = pipeline_depth
+        self.timeout = timeout
+        self._next_id = 0
+        # Side channel messages by request id. They are received by a thread as they come,
+        # so the server never blocks on a full pipe while the fuzzer waits for a response
+        self._pending = {}
+        self._received = threading.Condition()
+        # Requests that hung ("Timeout") or killed ("Crash") the server, by id
+        self._failed: dict[int, str] = {}
+        self._start_server()
+
+    def _start_server(self):
+        context = multiprocessing.get_context("fork")
+        self._results, server_results = context.Pipe(duplex=False)
+        self._running = context.Value("q", -1, lock=False)
+        self._server = context.Process(
+            target=_serve_target,
+            args=(self.program_module, server_results, self._running, self.tracer_name),
+            daemon=True,
+        )
+        self._server.start()
+        server_results.close()
+        self.port = self._results.recv()
+        self._connections = [_Connection(self.port, self.timeout) for _ in range(self.n_connections)]
+        self._receiver = threading.Thread(target=self._receive_results, args=(self._results,), daemon=True)
+        self._receiver.start()
+
+    def _stop_server(self):
+        # The server goes first: its handlers must not see the connections closing
+        self._server.terminate()
+        self._server.join()
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+        self._results.close()
+
+    def _receive_results(self, results):
+        while True:
+            try:
+                message_id, execution_time, lines, exception = results.recv()
+            except (EOFError, OSError):
+                return
+            with self._received:
+                self._pending[int(message_id)] = (execution_time, lines, exception)
+                self._received.notify_all()
+
+    def _execute_input(self, input):
+        result = self.execute_batch([input], 1)[0]
+        return result.exceptions, result.execution_time, result.new_coverage
+
+    def execute_batch(self, inputs: list, n_connections: int | None = None) -> list[ExecutionResult]:
+        requests = []
+        for input in inputs:
+            requests.append((self._next_id, input.encode("utf-8", "surrogatepass")))
+            self._next_id += 1
+
+        # Round-robin over the connections, in rounds of at most `pipeline_depth` requests per connection
+        unsent = requests
+        while unsent:
+            connections = self._connections[:n_connections]
+            round_size = len(connections) * self.pipeline_depth
+            batch, unsent = unsent[:round_size], unsent[round_size:]
+            assigned = [batch[i::len(connections)] for i in range(len(connections))]
+            answered = set()
+            waiting = batch[0][0]
+            try:
+                for connection, chunk in zip(connections, assigned):
+                    if chunk:
+                        connection.send(chunk)
+                for connection, chunk in zip(connections, assigned):
+                    for request_id, _ in chunk:
+                        waiting = request_id
+                        connection.read_response()
+                        answered.add(request_id)
+            except OSError as e:
+                # Timeout or closed connection: the request running the target hangs or crashed the server,
+                # or the one without response when the target is idle.
+                # Restart the server, the other unanswered requests are sent again
+                running = self._running.value
+                self._failed[running if running != -1 else waiting] = "Timeout" if isinstance(e, TimeoutError) else "Crash"
+                self._stop_server()
+                self._start_server()
+                unsent = [
+                    request for request in batch
+                    if request[0] not in answered and request[0] not in self._failed
+                ] + unsent
+
+        return [self._record(input, request_id) for input, (request_id, _) in zip(inputs, requests)]
+
+    def _record(self, input, request_id: int) -> ExecutionResult:
+        """Update the coverage with the side channel message of a request."""
+        failure = self._failed.pop(request_id, None)
+        if failure == "Timeout":
+            execution_time, lines = self.timeout, frozenset()
+            exception = ("Timeout", f"No response after {self.timeout} s", [], "")
+        elif failure == "Crash":
+            execution_time, lines = 0.0, frozenset()
+            exception = ("Crash", "The target server stopped", [], "")
+        else:
+            with self._received:
+                self._received.wait_for(lambda: request_id in self._pending)
+                execution_time, lines, exception = self._pending.pop(request_id)
+
+        self._input_coverage.clear()
+        self._input_coverage |= lines
+        self.last_exception = RemoteException(*exception) if exception is not None else None
+        self.executions += 1
+        self.total_execution_time += execution_time
+        new_coverage = self._input_coverage - self._coverage
+        self._coverage |= new_coverage
+        return ExecutionResult(
+            input, int(exception is not None), execution_time, new_coverage,
+            lines, len(self._coverage), self.last_exception,
+        )
+
+    def close(self):
+        """Close the connections and stop the server."""
+        self._stop_server()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,81 @@
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+
+
+class PersistentExecutor(AbstractExecutor):
+    """
+    # The `PersistentExecutor` class runs a stateful target in persistent mode.
+    The target stays in the fuzzer process (tracer and target lookups are set up once), but its state
+    is reset before every input: either `reset(target)` is called (e.g. `parser.reset()`),
+    or a fresh target is built with `factory()` (e.g. `lambda: HTMLParser().feed`).
+    Both hooks run outside of tracing, so their lines are never counted as coverage.
+
+    Every input reaching new coverage is run `verify_runs` more times: an input covering other lines
+    (or raising another exception) on a re-run is recorded in `unstable_inputs`, as the non-determinism
+    would otherwise be mistaken for progress.
+    """
+
+    def __init__(self, program_module=None, factory=None, reset=None, verify_runs: int = 1, **kwargs):
+        assert (factory is None) != (reset is None), "Error: Provide either a factory or a reset hook."
+        if program_module is None:
+            assert factory is not None, "Error: No target provided."
+            program_module = factory()
+        super().__init__(program_module, **kwargs)
+        self.factory = factory
+        self.reset = reset
+        self.verify_runs = verify_runs
+        # Inputs found non-deterministic and the lines that differed between runs
+        self.unstable_inputs: list[tuple[str, set]] = []
+        self.verified_inputs = 0
+
+    def _reset_target(self):
+        if self.factory is not None:
+            self.program_module = self.factory()
+        else:
+            self.reset(self.program_module)
+
+    def _run(self, input):
+        self._reset_target()
+        return super()._run(input)
+
+    def _run_untraced(self, input) -> float:
+        self._reset_target()
+        return super()._run_untraced(input)
+
+    def _execute_input(self, input):
+        exceptions, execution_time, new_coverage = super()._execute_input(input)
+        if new_coverage and self.verify_runs > 0:
+            self._verify(input)
+        return exceptions, execution_time, new_coverage
+
+    def _verify(self, input):
+        """Re-run an interesting input and compare its behaviour with the first run."""
+        lines = set(self._input_coverage)
+        exception = type(self.last_exception)
+        last_exception = self.last_exception
+        trace_bits = bytes(self.edge_map.trace_bits) if self.edge_map is not None else None
+        classified = self.edge_map.classified().tobytes() if self.edge_map is not None else None
+
+        unstable = set()
+        for _ in range(self.verify_runs):
+            self._run(input)
+            unstable |= lines ^ self._input_coverage
+            if type(self.last_exception) is not exception or (
+                classified is not None and self.edge_map.classified().tobytes() != classified
+            ):
+                unstable.add(None)
+        self.verified_inputs += 1
+        if unstable:
+            self.unstable_inputs.append((input, unstable - {None}))
+
+        # The fuzzer sees the results of the first run
+        self._input_coverage.clear()
+        self._input_coverage |= lines
+        self.last_exception = last_exception
+        if trace_bits is not None:
+            self.edge_map.trace_bits[:] = trace_bits
+
+    def stability(self) -> float:
+        """Fraction of the verified inputs that behaved the same on every run (1.0 if none was verified)."""
+        if self.verified_inputs == 0:
+            return 1.0
+        return 1 - len(self.unstable_inputs) / self.verified_inputs
@@ -0,0 +1,8 @@
+import random
+
+
+def derive_rng(campaign_seed: int, *keys) -> random.Random:
+    """Return a `random.Random` derived from the campaign seed and `keys`
+    (e.g. `derive_rng(seed, "fuzzer")`, `derive_rng(seed, "worker", 3, "schedule")`).
+    Each component of a campaign gets its own independent and reproducible stream."""
+    return random.Random("/".join(str(key) for key in (campaign_seed, *keys)))
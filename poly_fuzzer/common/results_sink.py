@@ -0,0 +1,169 @@
+import bisect
+import collections
+import gzip
+import struct
+from array import array
+
+from poly_fuzzer.common.budget import Budget
+
+# The sinks store plain arrays, NumPy is only imported to convert them (`np.asarray`)
+
+
+_LENGTH = struct.Struct("<I")
+
+
+class ChangePointSeries:
+    """
+    # The `ChangePointSeries` class stores a step series (e.g. the coverage after each input)
+    by its change points only. It reads like a list of one value per input: `len`, indexing
+    (negative indices included) and `np.asarray` rebuild the values on demand.
+    """
+
+    def __init__(self) -> None:
+        self.indices = array("q")
+        self.values = array("q")
+        self._length = 0
+
+    def append(self, value: int):
+        if not self.values or value != self.values[-1]:
+            self.indices.append(self._length)
+            self.values.append(value)
+        self._length += 1
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> int:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ChangePointSeries index out of range")
+        return self.values[bisect.bisect_right(self.indices, index) - 1]
+
+    def __iter__(self):
+        for value, count in zip(self.values, self._counts()):
+            for _ in range(count):
+                yield value
+
+    def _counts(self) -> list[int]:
+        ends = self.indices[1:].tolist() + [self._length]
+        return [end - start for start, end in zip(self.indices, ends)]
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy as np
+        counts = self._counts()
+        return np.repeat(np.asarray(self.values, dtype=dtype or np.int64), counts)
+
+
+class RingBuffer:
+    """
+    # The `RingBuffer` class keeps the last `size` values of a float series in a fixed size array,
+    with the count and total of all the values ever appended.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._buffer = array("d", bytes(8 * size))
+        self.count = 0
+        self.total = 0.0
+
+    def append(self, value: float):
+        self._buffer[self.count % len(self._buffer)] = value
+        self.count += 1
+        self.total += value
+
+    def __len__(self) -> int:
+        return min(self.count, len(self._buffer))
+
+    def __getitem__(self, index: int) -> float:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("RingBuffer index out of range")
+        return self._buffer[(self.count - length + index) % len(self._buffer)]
+
+    def _values(self) -> array:
+        if self.count <= len(self._buffer):
+            return self._buffer[:self.count]
+        start = self.count % len(self._buffer)
+        return self._buffer[start:] + self._buffer[:start]
+
+    def __iter__(self):
+        return iter(self._values())
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy as np
+        return np.array(self._values(), dtype=dtype)
+
+    def mean(self) -> float:
+        """Mean of all the values ever appended."""
+        return self.total / self.count if self.count else 0.0
+
+
+class ListSink:
+    """Keep every input, coverage and execution time in lists (the original results of `run_fuzzer`)."""
+
+    def __init__(self) -> None:
+        self.inputs = []
+        self.coverage = []
+        self.execution_times = []
+
+    def record(self, input, coverage: int, execution_time: float):
+        self.inputs.append(input)
+        self.coverage.append(coverage)
+        self.execution_times.append(execution_time)
+
+    def close(self):
+        pass
+
+
+class StreamingSink:
+    """
+    # The `StreamingSink` class records the results of a campaign in bounded memory.
+    Coverage is kept at its change points only, execution times in a ring buffer of the last `window`
+    inputs and only the last `recent_inputs` inputs stay in memory. With `inputs_path`, every input is
+    also streamed to a gzip file (read it back with `read_inputs`).
+    """
+
+    def __init__(self, window: int = 100_000, recent_inputs: int = 100, inputs_path: str | None = None) -> None:
+        self.inputs = collections.deque(maxlen=recent_inputs)
+        self.coverage = ChangePointSeries()
+        self.execution_times = RingBuffer(window)
+        self.inputs_path = inputs_path
+        self._inputs_file = gzip.open(inputs_path, "wb", compresslevel=1) if inputs_path else None
+
+    def record(self, input, coverage: int, execution_time: float):
+        self.inputs.append(input)
+        self.coverage.append(coverage)
+        self.execution_times.append(execution_time)
+        if self._inputs_file is not None:
+            data = input.encode("utf-8", "surrogatepass")
+            self._inputs_file.write(_LENGTH.pack(len(data)) + data)
+
+    def close(self):
+        if self._inputs_file is not None:
+            self._inputs_file.close()
+            self._inputs_file = None
+
+
+# Above this number of executions, a campaign is long enough for `sink_for_budget` to bound its memory
+MAX_LIST_EXECUTIONS = 1_000_000
+
+
+def sink_for_budget(budget: Budget | None = None) -> ListSink | StreamingSink:
+    """Default sink of a run: a `ListSink` when the budget caps the executions at `MAX_LIST_EXECUTIONS`
+    or less, a `StreamingSink` for long campaigns (time or plateau budgets, larger execution caps)."""
+    if budget is None or (budget.executions is not None and budget.executions <= MAX_LIST_EXECUTIONS):
+        return ListSink()
+    return StreamingSink()
+
+
+def read_inputs(path: str):
+    """Yield the inputs streamed to `path` by a `StreamingSink`, in execution order."""
+    with gzip.open(path, "rb") as f:
+        while True:
+            header = f.read(_LENGTH.size)
+            if len(header) < _LENGTH.size:
+                return
+            (length,) = _LENGTH.unpack(header)
+            yield f.read(length).decode("utf-8", "surrogatepass")
@@ -0,0 +1,86 @@
+import math
+
+
+class SumTree:
+    """
+    # The `SumTree` class keeps the weights of a growing population in a Fenwick tree.
+    Appending a weight, updating a weight and sampling an index proportionally to its weight
+    all cost O(log n), instead of rebuilding a normalized weight list for every pick.
+    Updates add the difference of the weights to the nodes, so their rounding errors pile up: the tree
+    is rebuilt from the weights once per `len(tree)` updates, which keeps the amortized cost at O(log n).
+    """
+
+    def __init__(self) -> None:
+        # 1-based Fenwick tree, self._tree[i] holds the sum of the weights in (i - lowbit(i), i]
+        self._tree: list[float] = [0.0]
+        self._weights: list[float] = []
+        self._updates_since_rebuild = 0
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    @property
+    def total(self) -> float:
+        """Sum of the weights, as seen by `find`."""
+        return self._prefix(len(self._weights))
+
+    def rebuild(self, weights: list[float] | None = None):
+        """Rebuild the tree in O(n) from `weights`, or from the current weights."""
+        if weights is not None:
+            self._weights = list(weights)
+        n = len(self._weights)
+        self._tree = [0.0] + self._weights
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self._tree[parent] += self._tree[i]
+        self._updates_since_rebuild = 0
+
+    def _prefix(self, i: int) -> float:
+        """Sum of the first `i` weights."""
+        total = 0.0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def append(self, weight: float):
+        """Add a weight at the end."""
+        self._weights.append(weight)
+        i = len(self._weights)
+        self._tree.append(weight + self._prefix(i - 1) - self._prefix(i - (i & -i)))
+
+    def update(self, index: int, weight: float):
+        """Set the weight of `index` (0-based)."""
+        delta = weight - self._weights[index]
+        if delta == 0:
+            return
+        self._weights[index] = weight
+        self._updates_since_rebuild += 1
+        if self._updates_since_rebuild >= len(self._weights):
+            self.rebuild()
+            return
+        i = index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def weight(self, index: int) -> float:
+        return self._weights[index]
+
+    def find(self, value: float) -> int:
+        """Return the index (0-based) whose cumulative weight range contains `value`,
+        with 0 <= `value` < `self.total`."""
+        assert self._weights, "Error: Empty SumTree."
+        # A `value` out of range (e.g. computed from a stale total) still lands on a positive weight
+        value = min(max(value, 0.0), math.nextafter(self.total, 0.0))
+        index = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            next_index = index + step
+            if next_index < len(self._tree) and self._tree[next_index] <= value:
+                index = next_index
+                value -= self._tree[next_index]
+            step >>= 1
+        # Guard against rounding errors pointing past the last weight
+        return min(index, len(self._weights) - 1)
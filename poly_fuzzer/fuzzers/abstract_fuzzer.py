@@ -1,11 +1,31 @@
 import abc
+import random
+import time
 
-from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_executor import AbstractExecutor, ExecutionResult
+from poly_fuzzer.common.budget import Budget, as_budget
+from poly_fuzzer.common.campaign_stats import CampaignStats
+from poly_fuzzer.common.crash_triage import CrashTriage
+from poly_fuzzer.common.replay_executor import ReplayExecutor
+from poly_fuzzer.common.results_sink import sink_for_budget
 
 
 class AbstractFuzzer(abc.ABC):
-    def __init__(self, executor: AbstractExecutor):
+    def __init__(self, executor: AbstractExecutor, rng: random.Random | None = None):
         self.executor = executor
+        # All the randomness of the fuzzer comes from this generator, so campaigns can be replayed
+        self.rng = rng if rng is not None else random.Random()
+        # Exceptions are bucketed by signature, set a `CrashTriage(crash_dir)` to save the reproducers
+        self.triage = CrashTriage()
+        # Results of the input being evaluated by `_update`
+        self.last_result: ExecutionResult | None = None
+        # Builds the sink of the inputs, coverage and execution times of each run,
+        # e.g. `lambda: StreamingSink(inputs_path="inputs.gz")`. When None, `sink_for_budget` keeps
+        # every value for runs of a bounded number of executions and bounds the memory of long campaigns
+        self.sink_factory = None
+        # Time spent in each phase and periodic reports, e.g.
+        # `CampaignStats(interval=10, callbacks=[stats_line(), FuzzerStatsFile("fuzzer_stats.json")])`
+        self.stats = CampaignStats()
 
     @abc.abstractmethod
     def generate_input(self):
@@ -13,37 +33,190 @@ class AbstractFuzzer(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def _update(self, input):
+    def _update(self, input, new_coverage):
         """Update the fuzzer with based on the result of the input evaluation.
+        `new_coverage` holds the lines covered for the first time by the input.
         Results are stored in the data attribute of the fuzzer.
         """
         pass
 
-    def run_fuzzer(self, budget=10):
-        """Run the fuzzer within a time budget."""
+    def run_fuzzer(self, budget: int | Budget = 10):
+        """Run the fuzzer until the budget is exhausted: a number of inputs,
+        or a `Budget` with wall-clock and coverage plateau limits."""
+        budget = as_budget(budget)
+        self._init_data(budget)
+        start_time = time.perf_counter()
+        budget.start()
+
+        try:
+            while not budget.exhausted():
+                _, new_coverage = self.fuzz_one()
+                budget.record(bool(new_coverage))
+
+        except Exception as e:
+            print(f"Error: {str(e)}")
+
+        self._end_run(start_time, budget)
+        return self.data
+
+    def _end_run(self, start_time: float, budget: Budget):
+        self.sink.close()
+        elapsed = time.perf_counter() - start_time
+        if elapsed > 0:
+            self.data["execs_per_sec"] = self.data["executions"] / elapsed
+        self.data["run_time"] = elapsed
+        self.data["stop_reason"] = budget.stop_reason
+        if self.stats.callbacks:
+            self.stats.report(self)
+
+    def _init_data(self, budget: Budget | None = None):
+        """Reset the results stored in the data attribute."""
+        self.sink = self.sink_factory() if self.sink_factory is not None else sink_for_budget(budget)
+        self.stats.start(self.executor)
         self.data = {
-            "coverage": [],
-            "inputs": [],
-            "execution_times": [],
+            "coverage": self.sink.coverage,
+            "inputs": self.sink.inputs,
+            "execution_times": self.sink.execution_times,
+            "executions": 0,
             "exceptions": 0,
+            "execs_per_sec": 0.0,
+            "run_time": 0.0,
+            "stop_reason": None,
+            "interesting": [],
+            "crashes": 0,
         }
-        #global coverage
-        coverage = []
+
+    def fuzz_one(self):
+        """Generate, execute and evaluate a single input.
+        Return the input and the coverage it reached for the first time."""
+        stats = self.stats
+        start = time.perf_counter_ns()
+        input = self.generate_input()
+        generated = time.perf_counter_ns()
+        exceptions, execution_time, new_coverage = self.executor._execute_input(
+            input
+        )
+        executed = time.perf_counter_ns()
+        # The coverage of the input is only read by `_update`, before the next execution
+        result = ExecutionResult(
+            input, exceptions, execution_time, new_coverage,
+            self.executor.input_coverage, len(self.executor.coverage), self.executor.last_exception,
+        )
+        self._evaluate(result)
+        stats.add("generate", generated - start)
+        stats.add("execute", executed - generated)
+        stats.add("update", time.perf_counter_ns() - executed)
+        return input, new_coverage
+
+    def fuzz_batch(self, size: int) -> list[ExecutionResult]:
+        """Generate `size` inputs, execute them with `executor.execute_batch` and evaluate them in order.
+        Inputs of a batch are generated without the feedback of the inputs before them in the batch."""
+        inputs, states = self._generate_batch(size)
+        start = time.perf_counter_ns()
+        results = self.executor.execute_batch(inputs)
+        executed = time.perf_counter_ns()
+        self._evaluate_batch(states, results)
+        self.stats.add("execute", executed - start)
+        self.stats.add("update", time.perf_counter_ns() - executed)
+        return results
+
+    async def run_fuzzer_async(self, budget: int | Budget = 10, batch_size: int = 64):
+        """Run the fuzzer in batches, generating the next batch while the current one executes.
+        Worth it when the executor waits on something else than the interpreter
+        (fork server, remote or I/O bound target)."""
+        import asyncio
+        budget = as_budget(budget)
+        self._init_data(budget)
+        start_time = time.perf_counter()
+        budget.start()
 
         try:
-            for i in range(budget):
-                input = self.generate_input()
-                self.data["inputs"].append(input)
-                exceptions, execution_time, coverage = self.executor._execute_input(
-                    input
+            inputs, states = self._generate_batch(budget.remaining(batch_size))
+            while inputs:
+                running = asyncio.ensure_future(self.executor.execute_batch_async(inputs))
+                # Let the execution start before generating the next batch
+                await asyncio.sleep(0)
+                next_inputs, next_states = self._generate_batch(
+                    min(batch_size, budget.remaining(batch_size + len(inputs)) - len(inputs))
                 )
-                current_coverage = len(coverage)
-                self.data["coverage"].append(current_coverage)
-                self.data["execution_times"].append(execution_time)
-                self.data["exceptions"] += exceptions
-                self._update(input)
+                results = await running
+                # Execution overlaps with generation: its time is not counted in a phase
+                start = time.perf_counter_ns()
+                for result in results:
+                    budget.record(bool(result.new_coverage))
+                self._evaluate_batch(states, results)
+                self.stats.add("update", time.perf_counter_ns() - start)
+                if budget.exhausted():
+                    # The batch generated ahead is dropped without being executed
+                    break
+                inputs, states = next_inputs, next_states
 
         except Exception as e:
             print(f"Error: {str(e)}")
 
+        self._end_run(start_time, budget)
         return self.data
+
+    def _generate_batch(self, size: int) -> tuple[list, list]:
+        start = time.perf_counter_ns()
+        inputs = []
+        states = []
+        for _ in range(size):
+            inputs.append(self.generate_input())
+            states.append(self._generation_state())
+        self.stats.add("generate", time.perf_counter_ns() - start)
+        return inputs, states
+
+    def _evaluate_batch(self, states: list, results: list[ExecutionResult]):
+        for state, result in zip(states, results):
+            self._restore_generation_state(state)
+            self._evaluate(result)
+
+    def _generation_state(self):
+        """What `_update` needs to know about how the last input was generated,
+        saved when inputs are generated ahead of their evaluation."""
+        return None
+
+    def _restore_generation_state(self, state):
+        pass
+
+    def _evaluate(self, result: ExecutionResult):
+        """Record the results of an input and update the fuzzer."""
+        self.last_result = result
+        input = result.input
+        index = self.data["executions"]
+        self.data["executions"] += 1
+        self.sink.record(input, result.total_coverage, result.execution_time)
+        self.data["exceptions"] += result.exceptions
+        if result.exceptions and result.exception is not None:
+            self.triage.record(input, result.exception, index)
+            self.data["crashes"] = len(self.triage.buckets)
+        if result.new_coverage:
+            self.data["interesting"].append(index)
+        self._update(input, result.new_coverage)
+        if self.stats.count(result.exceptions, bool(result.new_coverage)):
+            self.stats.report(self)
+
+    def _replay_executes(self) -> bool:
+        """Whether `replay` needs the lines covered by each input, and so must execute the inputs again."""
+        return False
+
+    def _corpus_size(self) -> int:
+        """Number of seeds the fuzzer mutates, reported by the campaign statistics."""
+        return 0
+
+    def replay(self, index: int, interesting: list[int]) -> str:
+        """Regenerate input #`index` of a campaign, without executing the target when the fuzzer
+        only depends on which inputs found new coverage (see `_replay_executes`).
+        The fuzzer must be built as in the original campaign (same seeds, same rng seeds, a new executor)
+        and `interesting` is the `data["interesting"]` list recorded by that campaign."""
+        executor = self.executor
+        if not self._replay_executes():
+            self.executor = ReplayExecutor(interesting)
+        try:
+            self._init_data()
+            for i in range(index + 1):
+                input, _ = self.fuzz_one()
+        finally:
+            self.executor = executor
+        return input
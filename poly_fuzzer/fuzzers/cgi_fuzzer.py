@@ -1,8 +1,3 @@
-import matplotlib.pyplot as plt
-import numpy as np
-
-from poly_fuzzer.fuzzers.mutation_fuzzer import MutationFuzzer
-from poly_fuzzer.common.abstract_executor import AbstractExecutor
 from poly_fuzzer.common.abstract_seed import AbstractSeed
 from poly_fuzzer.power_schedules.url_schedule import URLPowerSchedule
 from poly_fuzzer.common.abstract_grammar import AbstractGrammar
@@ -19,58 +14,41 @@ SEEDS: list[AbstractSeed] = [
     AbstractSeed('www.moodle.polymtl.ca')
 ]
 MAX_SEEDS: int = 5
-
-def test_mutation_fuzzer_no_power_no_grammar(test_module):
-    executor = AbstractExecutor(test_module)
-    mutation_fuzzer = MutationFuzzer(executor, SEEDS)
-
-    output = mutation_fuzzer.run_fuzzer(budget=BUDGET)
-
-    return output
-
-def test_mutation_fuzzer_with_power_no_grammar(test_module):
-    executor = AbstractExecutor(test_module)
-    power = URLPowerSchedule()
-    seeds = SEEDS
-    mutation_fuzzer = MutationFuzzer(executor, seeds, power)
-
-    output = mutation_fuzzer.run_fuzzer(budget=BUDGET)
-
-    return output
-
-def test_mutation_fuzzer_with_power_with_grammar(test_module):
-    gram = {
-        "<start>": ["<url>"],
-        "<url>": ["www.<content><domain>"],
-        "<domain>": [".ca", ".com", ".org", ".net", ".edu", ".us"],
-        "<content>": ["<word>"] * 5,
-        "<word>": ["mazes", "puginarug", "optical", "longdogechallenge"]
-    }
-    grammar = AbstractGrammar(gram)
-    seeds = [AbstractSeed(grammar.generate_input()) for _ in range(MAX_SEEDS)]
-    executor = AbstractExecutor(test_module)
-    power = URLPowerSchedule()
-    mutation_fuzzer = MutationFuzzer(executor, seeds, power)
-
-    output = mutation_fuzzer.run_fuzzer(budget=BUDGET)
-
-    return output
+GRAMMAR: AbstractGrammar = AbstractGrammar({
+    "<start>": ["<url>"],
+    "<url>": ["www.<content><domain>"],
+    "<domain>": [".ca", ".com", ".org", ".net", ".edu", ".us"],
+    "<content>": ["<word>"] * 5,
+    "<word>": ["mazes", "puginarug", "optical", "longdogechallenge"]
+})
+RESULTS_PATH: str = "results/cgi_decode.npz"
+
+
+def experiment_configs(test_module) -> list["ExperimentConfig"]:
+    """Configurations compared by the repeated-trial experiment."""
+    from poly_fuzzer.fuzzers.experiment_runner import ExperimentConfig
+
+    return [
+        ExperimentConfig("no_power_no_grammar", test_module, BUDGET, SEEDS),
+        ExperimentConfig("with_power_no_grammar", test_module, BUDGET, SEEDS, URLPowerSchedule()),
+        ExperimentConfig(
+            "with_power_with_grammar", test_module, BUDGET, power_schedule=URLPowerSchedule(),
+            grammar=GRAMMAR, n_generated_seeds=MAX_SEEDS
+        ),
+    ]
 
 
 if __name__ == '__main__':
-    coverages_no_power_no_grammar = []
-    coverages_with_power_no_grammar = []
-    coverages_with_power_with_grammar = []
-
-    for i in range(NUMBER_RUNS):
-        coverage = np.array(test_mutation_fuzzer_no_power_no_grammar(cgi_decode)['coverage'])
-        coverages_no_power_no_grammar.append(coverage)
-
-        coverage = np.array(test_mutation_fuzzer_with_power_no_grammar(cgi_decode)['coverage'])
-        coverages_with_power_no_grammar.append(coverage)
-
-        coverage = np.array(test_mutation_fuzzer_with_power_with_grammar(cgi_decode)['coverage'])
-        coverages_with_power_with_grammar.append(coverage)
+    # matplotlib et NumPy ne sont chargés que pour l'expérience et ses figures
+    import matplotlib.pyplot as plt
+    import numpy as np
+    from poly_fuzzer.fuzzers.experiment_runner import run_experiment
+
+    # Les essais sont indépendants et exécutés en parallèle, les résultats sont sauvegardés dans RESULTS_PATH
+    results = run_experiment(experiment_configs(cgi_decode), NUMBER_RUNS, output_path=RESULTS_PATH)
+    coverages_no_power_no_grammar = results["no_power_no_grammar"]
+    coverages_with_power_no_grammar = results["with_power_no_grammar"]
+    coverages_with_power_with_grammar = results["with_power_with_grammar"]
 
     avg_coverage_no_power_no_grammar = np.average(coverages_no_power_no_grammar, axis=0)
     print("Couverture moyenne pour aucun power schedule et grammaire:", avg_coverage_no_power_no_grammar[-1])
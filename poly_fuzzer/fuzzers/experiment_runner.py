@@ -0,0 +1,131 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from poly_fuzzer.fuzzers.mutation_fuzzer import MutationFuzzer
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.persistent_executor import PersistentExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.abstract_grammar import AbstractGrammar
+from poly_fuzzer.common.budget import Budget, as_budget
+from poly_fuzzer.common.random_state import derive_rng
+from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
+
+
+class ExperimentConfig:
+    """
+    # The `ExperimentConfig` class describes one configuration of a repeated-trial experiment.
+    The seeds are either given directly, generated from `grammar` or produced by `seed_generator(rng)`
+    at the beginning of each trial. A stateful target gets a `reset(target)` hook, called before every input
+    by a `PersistentExecutor`. The budget is a number of inputs or a `Budget`: with a plateau limit,
+    trials stop once their coverage stops growing and their curve keeps its last coverage up to
+    `budget.executions`. Everything is sent to the worker processes, so the target,
+    the power schedule and the seed generator must be picklable; each trial gets its own copy.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            program_module,
+            budget: int | Budget,
+            seeds: list[AbstractSeed] | None = None,
+            power_schedule: AbstractPowerSchedule | None = None,
+            grammar: AbstractGrammar | None = None,
+            seed_generator=None,
+            n_generated_seeds: int = 10,
+            reset=None,
+        ) -> None:
+        assert seeds or grammar is not None or seed_generator is not None, "Error: No seed provided."
+        self.name = name
+        self.program_module = program_module
+        self.budget = budget
+        self.seeds = seeds
+        self.power_schedule = power_schedule
+        self.grammar = grammar
+        self.seed_generator = seed_generator
+        self.n_generated_seeds = n_generated_seeds
+        self.reset = reset
+
+
+def trial_seed(base_seed: int, config_index: int, trial: int) -> int:
+    """Deterministic seed of a trial, independent of the order in which trials run."""
+    return int(np.random.SeedSequence([base_seed, config_index, trial]).generate_state(1)[0])
+
+
+def run_trial(config: ExperimentConfig, seed: int) -> np.ndarray:
+    """Run a single trial of `config` and return its coverage curve.
+    Every random generator of the trial is derived from `seed`."""
+    if config.grammar is not None:
+        config.grammar.rng = derive_rng(seed, "grammar")
+        seeds = [AbstractSeed(config.grammar.generate_input()) for _ in range(config.n_generated_seeds)]
+    elif config.seed_generator is not None:
+        rng = derive_rng(seed, "seeds")
+        seeds = [AbstractSeed(config.seed_generator(rng)) for _ in range(config.n_generated_seeds)]
+    else:
+        seeds = [AbstractSeed(s.data) for s in config.seeds]
+    if config.power_schedule is not None:
+        config.power_schedule.rng = derive_rng(seed, "schedule")
+
+    if config.reset is not None:
+        executor = PersistentExecutor(config.program_module, reset=config.reset)
+    else:
+        executor = AbstractExecutor(config.program_module)
+    fuzzer = MutationFuzzer(executor, seeds, config.power_schedule, rng=derive_rng(seed, "fuzzer"))
+    budget = as_budget(config.budget)
+    output = fuzzer.run_fuzzer(budget)
+
+    # A fuzzer stopped early (error, time or plateau) keeps its last coverage for the rest of the budget
+    coverage = np.asarray(output["coverage"], dtype=np.int64)
+    return _pad(coverage, budget.executions or len(coverage))
+
+
+def _pad(coverage: np.ndarray, length: int) -> np.ndarray:
+    curve = np.full(length, coverage[-1] if len(coverage) else 0, dtype=np.int64)
+    curve[:len(coverage)] = coverage
+    return curve
+
+
+def run_experiment(
+        configs: list[ExperimentConfig],
+        n_trials: int,
+        base_seed: int = 0,
+        max_workers: int | None = None,
+        output_path: str | None = None,
+    ) -> dict[str, np.ndarray]:
+    """Run `n_trials` independent trials of each configuration over a process pool.
+    Return, for each configuration name, the coverage curves as an array of shape (n_trials, budget).
+    Without a limit on the number of inputs, curves are padded to the longest trial of the configuration.
+    The results are also saved to `output_path` (a `.npz` file) when given."""
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            config.name: [
+                pool.submit(run_trial, config, trial_seed(base_seed, config_index, trial))
+                for trial in range(n_trials)
+            ]
+            for config_index, config in enumerate(configs)
+        }
+        results = {}
+        for name, trials in futures.items():
+            curves = [future.result() for future in trials]
+            length = max(len(curve) for curve in curves)
+            results[name] = np.stack([_pad(curve, length) for curve in curves])
+
+    if output_path is not None:
+        save_results(output_path, results)
+
+    return results
+
+
+def save_results(path: str, results: dict[str, np.ndarray]):
+    """Save the coverage curves of an experiment."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    np.savez_compressed(path, **results)
+
+
+def load_results(path: str) -> dict[str, np.ndarray]:
+    """Load the coverage curves saved by `run_experiment`."""
+    with np.load(path) as results:
+        return {name: results[name] for name in results.files}
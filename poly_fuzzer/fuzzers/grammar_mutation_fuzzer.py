@@ -0,0 +1,146 @@
+import random
+import time
+
+from poly_fuzzer.fuzzers.mutation_fuzzer import MutationFuzzer
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.abstract_grammar import AbstractGrammar
+from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
+
+
+class GrammarMutationFuzzer(MutationFuzzer):
+    """
+    # The `GrammarMutationFuzzer` class mutates the derivation trees of its seeds instead of their characters.
+    Each corpus entry keeps the derivation tree it was generated from. A candidate is made by regenerating
+    a random subtree, or by replacing it with a subtree of the same symbol taken from another seed (crossover),
+    so candidates stay syntactically valid and reach the code behind the input validation of the target.
+    With probability `havoc_probability` the candidate additionally gets character mutations.
+    #https://www.fuzzingbook.org/html/GreyboxGrammarFuzzer.html
+    """
+
+    TREE_MUTATORS = ("regenerate", "crossover")
+
+    def __init__(
+        self,
+        executor,
+        grammar: AbstractGrammar,
+        n_seeds: int = 10,
+        power_schedule: AbstractPowerSchedule = None,
+        rng: random.Random | None = None,
+        max_nonterminals: int = 10,
+        havoc_probability: float = 0.1,
+        **kwargs,
+    ):
+        super().__init__(executor, [], power_schedule, rng=rng, **kwargs)
+        self.grammar = grammar
+        self.compiled = grammar.compiled
+        self.max_nonterminals = max_nonterminals
+        self.havoc_probability = havoc_probability
+        for _ in range(n_seeds):
+            seed_tree = self.compiled.generate_tree(self.rng, grammar.START_SYMBOL, max_nonterminals)
+            seed = AbstractSeed(self.compiled.to_string(seed_tree))
+            seed.tree = seed_tree
+            self.seeds.append(seed)
+        self._rebuild_donors()
+        self.tree_mutator_stats = {name: {"uses": 0, "finds": 0} for name in self.TREE_MUTATORS}
+        # Tree of the last generated input (None after character mutations) and the mutator used
+        self._last_tree: list | None = None
+        self._last_tree_mutator: str | None = None
+
+    def generate_input(self):
+        inp = super().generate_input()
+        if self._last_seed is not None:
+            self._last_tree = self._last_seed.tree
+            self._last_tree_mutator = None
+        return inp
+
+    def _generation_state(self):
+        return super()._generation_state(), self._last_tree, self._last_tree_mutator
+
+    def _restore_generation_state(self, state):
+        state, self._last_tree, self._last_tree_mutator = state
+        super()._restore_generation_state(state)
+
+    def resume(self, corpus):
+        super().resume(corpus)
+        self._rebuild_donors()
+
+    def _rebuild_donors(self):
+        """Collect the trees of the seeds, the donors of the crossover.
+        `_donor_counts` counts the seeds of each tree (by identity), since seeds can share their tree."""
+        self._donors: list[list] = []
+        self._donor_counts: dict[int, int] = {}
+        for seed in self.seeds:
+            self._add_donor(seed.tree)
+
+    def _add_donor(self, tree: list | None):
+        if tree is not None:
+            self._donors.append(tree)
+            self._donor_counts[id(tree)] = self._donor_counts.get(id(tree), 0) + 1
+
+    def _make_seed(self, input) -> AbstractSeed:
+        """New seeds keep the derivation tree of the input."""
+        seed = AbstractSeed(input)
+        seed.tree = self._last_tree
+        self._add_donor(seed.tree)
+        return seed
+
+    def _update(self, input, new_coverage):
+        super()._update(input, new_coverage)
+        if self._last_tree_mutator is not None:
+            self.tree_mutator_stats[self._last_tree_mutator]["uses"] += 1
+            if new_coverage:
+                self.tree_mutator_stats[self._last_tree_mutator]["finds"] += 1
+
+    def _create_candidate(self):
+        start = time.perf_counter_ns()
+        if self.power_schedule:
+            parent = self.power_schedule.choose(self.seeds)
+        else:
+            parent = self.rng.choice(self.seeds)
+        chosen = time.perf_counter_ns()
+        self._last_parent = parent
+        self._last_operations = ()
+        self._last_tree_mutator = None
+
+        if parent.tree is None:
+            # Seeds found by character mutations have no tree, keep mutating their characters
+            tree = None
+            candidate = parent.data
+            havoc = True
+        else:
+            tree = self._mutate_tree(parent.tree)
+            candidate = self.compiled.to_string(tree)
+            havoc = self.rng.random() < self.havoc_probability
+
+        if havoc:
+            # The candidate is mutated only once, its encoding is not worth caching
+            candidates, operations = self.mutation_engine.mutate_batch([candidate], cache=False)
+            candidate, self._last_operations = candidates[0], operations[0]
+            tree = None
+        self._last_tree = tree
+        self.stats.add("schedule", chosen - start)
+        self.stats.add("mutate", time.perf_counter_ns() - chosen)
+        return candidate
+
+    def _mutate_tree(self, tree: list) -> list:
+        """Return a mutated copy of `tree`, sharing its unchanged subtrees."""
+        path, node = self.rng.choice(self.compiled.subtrees(tree))
+        mutator = self.rng.choice(self.TREE_MUTATORS)
+
+        if mutator == "crossover":
+            # Crossover needs a donor other than the tree being mutated
+            if len(self._donors) > self._donor_counts.get(id(tree), 0):
+                donor = self.rng.choice(self._donors)
+                while donor is tree:
+                    donor = self.rng.choice(self._donors)
+                candidates = [
+                    subtree for _, subtree in self.compiled.subtrees(donor) if subtree[0] == node[0]
+                ]
+                if candidates:
+                    self._last_tree_mutator = mutator
+                    return self.compiled.replace(tree, path, self.rng.choice(candidates))
+
+        # Regenerate the subtree with a fresh random expansion
+        self._last_tree_mutator = "regenerate"
+        subtree = self.compiled.expand([node[0], None], self.rng, self.max_nonterminals)
+        return self.compiled.replace(tree, path, subtree)
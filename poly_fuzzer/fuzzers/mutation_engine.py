@@ -0,0 +1,178 @@
+import random
+
+
+class BatchMutationEngine:
+    """
+    # The `BatchMutationEngine` class generates mutated candidates in batches.
+    All the random numbers of a batch (number of mutations, mutators, positions and characters)
+    are drawn at once, before any mutation, and the mutations are applied in place on `bytearray` buffers
+    instead of rebuilding a `str` for every single mutation.
+    The engine counts how often each mutator took part in a candidate that found new coverage and,
+    when `adaptive` is set, shifts the selection probabilities towards the productive mutators
+    (a lightweight version of MOpt, https://www.usenix.org/conference/usenixsecurity19/presentation/lyu).
+    """
+
+    DELETE = 0
+    REPLACE = 1
+    INSERT = 2
+    BIT_FLIP = 3
+    BYTE_FLIP = 4
+    BLOCK_DUPLICATE = 5
+    BLOCK_DELETE = 6
+    DICTIONARY_INSERT = 7
+    SPLICE = 8
+
+    NAMES = (
+        "delete", "replace", "insert", "bit_flip", "byte_flip",
+        "block_duplicate", "block_delete", "dictionary_insert", "splice",
+    )
+    ALL_MUTATORS = tuple(range(len(NAMES)))
+
+    # Maximum length of the blocks duplicated or deleted
+    MAX_BLOCK = 32
+    # Part of the probability always spread uniformly, so no mutator is ever starved
+    EXPLORATION = 0.2
+    # Maximum number of encoded inputs kept, the oldest ones are dropped first
+    MAX_ENCODED = 65_536
+
+    def __init__(
+        self,
+        rng: random.Random,
+        mutators: tuple[int, ...] = ALL_MUTATORS,
+        min_mutations: int = 1,
+        max_mutations: int = 10,
+        dictionary: list[str] | None = None,
+        adaptive: bool = True,
+    ):
+        # The generator of the batches is derived from the fuzzer generator to keep campaigns reproducible
+        self.batch_rng = random.Random(rng.getrandbits(64))
+        self.dictionary = [token.encode("utf-8") for token in dictionary or []]
+        if not self.dictionary:
+            mutators = tuple(m for m in mutators if m != self.DICTIONARY_INSERT)
+        self.mutators = list(mutators)
+        self.min_mutations = min_mutations
+        self.max_mutations = max_mutations
+        self.adaptive = adaptive
+        # Per mutator: number of candidates it took part in, and how many found new coverage
+        self.uses = [0] * len(self.NAMES)
+        self.finds = [0] * len(self.NAMES)
+        self.probabilities = [1 / len(self.mutators)] * len(self.mutators)
+        # Encoded seeds: seeds are mutated many times, they are encoded only once
+        self._encoded: dict[str, tuple[bytes, str]] = {}
+
+    def mutate_batch(
+            self,
+            parents: list[str],
+            splice_pool: list[str] | None = None,
+            cache: bool = True,
+        ) -> tuple[list[str], list[tuple[int, ...]]]:
+        """Return one mutated candidate for each parent, and the mutators applied to each candidate.
+        `splice_pool` holds the inputs the splice mutator can cross the parents with.
+        Set `cache` to False when the parents and the splice pool are one-off inputs rather than seeds,
+        so their encodings are not kept."""
+        if self.adaptive:
+            self._update_probabilities()
+        rng = self.batch_rng
+        uniform = rng.random
+        span = self.max_mutations - self.min_mutations + 1
+        counts = [self.min_mutations + int(uniform() * span) for _ in parents]
+        total = sum(counts)
+        operations = rng.choices(self.mutators, self.probabilities, k=total)
+        positions = [uniform() for _ in range(total)]
+        extents = [uniform() for _ in range(total)]
+        characters = [32 + int(uniform() * 95) for _ in range(total)]
+        bits = [int(uniform() * 8) for _ in range(total)]
+        splice_pool = splice_pool or parents
+        encode = self._encode if cache else self._encode_uncached
+
+        candidates = []
+        applied = []
+        k = 0
+        for parent, count in zip(parents, counts):
+            data, encoding = encode(parent)
+            buffer = bytearray(data)
+            for _ in range(count):
+                self._apply(buffer, operations[k], positions[k], extents[k], characters[k], bits[k], splice_pool, encode)
+                k += 1
+            candidates.append(buffer.decode(encoding, "replace"))
+            applied.append(tuple(set(operations[k - count:k])))
+        return candidates, applied
+
+    def _apply(self, buffer: bytearray, operation: int, position: float, extent: float, character: int, bit: int, splice_pool: list[str], encode):
+        length = len(buffer)
+        if operation == self.DELETE:
+            if length > 5:
+                del buffer[int(position * length)]
+        elif operation == self.REPLACE:
+            if length > 0:
+                buffer[int(position * length)] = character
+        elif operation == self.INSERT:
+            buffer.insert(int(position * (length + 1)), character)
+        elif operation == self.BIT_FLIP:
+            if length > 0:
+                buffer[int(position * length)] ^= 1 << bit
+        elif operation == self.BYTE_FLIP:
+            if length > 0:
+                buffer[int(position * length)] ^= 0xFF
+        elif operation == self.BLOCK_DUPLICATE:
+            if length > 0:
+                start = int(position * length)
+                size = 1 + int(extent * min(length - start, self.MAX_BLOCK))
+                buffer[start:start] = buffer[start:start + size]
+        elif operation == self.BLOCK_DELETE:
+            if length > 5:
+                size = 1 + int(extent * min(length - 5, self.MAX_BLOCK))
+                start = int(position * (length - size + 1))
+                del buffer[start:start + size]
+        elif operation == self.DICTIONARY_INSERT:
+            token = self.dictionary[int(extent * len(self.dictionary))]
+            start = int(position * (length + 1))
+            buffer[start:start] = token
+        else:
+            # Splice: keep the head of the buffer and append the tail of another input
+            other, _ = encode(splice_pool[int(extent * len(splice_pool))])
+            buffer[int(position * length):] = other[int(position * len(other)):]
+
+    def record(self, operations: tuple[int, ...], interesting: bool):
+        """Credit the mutators of a candidate once it has been executed."""
+        for operation in operations:
+            self.uses[operation] += 1
+            if interesting:
+                self.finds[operation] += 1
+
+    def _update_probabilities(self):
+        """Selection probability proportional to the (smoothed) success rate of each mutator."""
+        rates = [(self.finds[mutator] + 1) / (self.uses[mutator] + 2) for mutator in self.mutators]
+        total = sum(rates)
+        n = len(self.mutators)
+        self.probabilities = [(1 - self.EXPLORATION) * rate / total + self.EXPLORATION / n for rate in rates]
+
+    def stats(self) -> dict[str, dict]:
+        """Uses, finds and current selection probability of each enabled mutator."""
+        return {
+            self.NAMES[mutator]: {
+                "uses": self.uses[mutator],
+                "finds": self.finds[mutator],
+                "probability": probability,
+            }
+            for mutator, probability in zip(self.mutators, self.probabilities)
+        }
+
+    def _encode(self, data: str) -> tuple[bytes, str]:
+        try:
+            return self._encoded[data]
+        except KeyError:
+            encoded = self._encode_uncached(data)
+            if len(self._encoded) >= self.MAX_ENCODED:
+                # Dicts keep the insertion order: drop the oldest encoding
+                del self._encoded[next(iter(self._encoded))]
+            self._encoded[data] = encoded
+            return encoded
+
+    @staticmethod
+    def _encode_uncached(data: str) -> tuple[bytes, str]:
+        # latin-1 keeps one byte per character, other inputs fall back to utf-8
+        try:
+            return data.encode("latin-1"), "latin-1"
+        except UnicodeEncodeError:
+            return data.encode("utf-8"), "utf-8"
@@ -1,8 +1,10 @@
 from poly_fuzzer.fuzzers.abstract_fuzzer import AbstractFuzzer
 import random
-import numpy as np
+import time
 from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.corpus_store import CorpusStore
 from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
+from poly_fuzzer.fuzzers.mutation_engine import BatchMutationEngine
 
 
 
@@ -11,6 +13,10 @@ class MutationFuzzer(AbstractFuzzer):
     # The `MutationFuzzer` class is a fuzzer that generates new inputs by mutating existing seeds using
     # various mutation techniques.
     A fuzzer that mutates the seed to generate new inputs.
+    Candidates are generated `batch_size` at a time by a `BatchMutationEngine`, which adapts
+    the choice of its mutators to how often each of them finds new coverage.
+    `dictionary` holds tokens of the input format (e.g. "://", "?", "</") used by the dictionary mutator.
+    With a `corpus`, the fuzzer resumes from the seeds stored in it and stores every new seed.
     #https://www.fuzzingbook.org/html/MutationFuzzer.html
     """
 
@@ -21,15 +27,46 @@ class MutationFuzzer(AbstractFuzzer):
         power_schedule: AbstractPowerSchedule = None,
         min_mutations: int = 1,
         max_mutations: int = 10,
+        rng: random.Random | None = None,
+        batch_size: int = 64,
+        dictionary: list[str] | None = None,
+        adaptive_mutators: bool = True,
+        corpus: CorpusStore | None = None,
     ):
-        super().__init__(executor)
+        super().__init__(executor, rng)
         self.seeds = seeds
         self.seed_index = 0
         self.executor = executor
         self.power_schedule = power_schedule
         self.min_mutations = min_mutations
         self.max_mutations = max_mutations
-        self.mutators = [self._delete_random_character, self._replace_random_character]
+        self.batch_size = batch_size
+        self.mutation_engine = BatchMutationEngine(
+            self.rng,
+            min_mutations=min_mutations,
+            max_mutations=max_mutations,
+            dictionary=dictionary,
+            adaptive=adaptive_mutators,
+        )
+        self._candidates: list[tuple[str, tuple[int, ...], AbstractSeed]] = []
+        # Mutators applied to the last generated input, and the seed it comes from
+        self._last_operations: tuple[int, ...] = ()
+        self._last_parent: AbstractSeed | None = None
+        # Initial seed executed by the last input while still seeding
+        self._last_seed: AbstractSeed | None = None
+        self.corpus = corpus
+        if corpus is not None:
+            self.resume(corpus)
+
+    def resume(self, corpus: CorpusStore):
+        """Add the seeds stored in `corpus` without executing them again,
+        and restore the line coverage they reached."""
+        known = {seed.data for seed in self.seeds}
+        loaded = [seed for seed in corpus.load_seeds() if seed.data not in known]
+        # Stored seeds were already executed: they go before the seeds still to execute
+        self.seeds[self.seed_index:self.seed_index] = loaded
+        self.seed_index += len(loaded)
+        self.executor.coverage.update(corpus.coverage())
 
     def generate_input(self):
 
@@ -38,58 +75,91 @@ class MutationFuzzer(AbstractFuzzer):
         and then we mutate the seeds to generate new inputs."""
         if self.seed_index < len(self.seeds):
             # Still seeding
-            inp = self.seeds[self.seed_index].data
+            self._last_seed = self.seeds[self.seed_index]
+            inp = self._last_seed.data
             self.seed_index += 1
+            self._last_operations = ()
+            self._last_parent = None
         else:
             # Mutating
             inp = self._create_candidate()
+            self._last_seed = None
 
         return inp
 
-    def _update(self, input):
-        """Update the fuzzer with the input and its coverage."""
-        if len(self.data["coverage"]) > 1:
-            if self.data["coverage"][-1] > self.data["coverage"][-2]:
-                self.seeds.append(AbstractSeed(input))
+    def _update(self, input, new_coverage):
+        """Update the fuzzer with the input and its coverage.
+        The input is kept as a seed when it covers new lines."""
+        self.mutation_engine.record(self._last_operations, bool(new_coverage))
+        new_seed = None
+        if new_coverage and self.data["executions"] > 1:
+            new_seed = self._make_seed(input)
+            self.seeds.append(new_seed)
 
-    def _create_candidate(self):
-        seed = np.random.choice(self.seeds)
+        if self.power_schedule or self.corpus is not None:
+            input_coverage = self.last_result.input_coverage
+            path_hash = hash(frozenset(input_coverage))
+            execution_time = self.last_result.execution_time
+            # Statistics of the initial seeds are known once they have been executed
+            for seed in (new_seed, self._last_seed):
+                if seed is not None:
+                    seed.path_hash = path_hash
+                    seed.exec_time = execution_time
+                    seed.coverage = len(input_coverage)
+                    if self.corpus is not None:
+                        self.corpus.add(seed, input_coverage)
+            if self.power_schedule:
+                self.power_schedule.update(self._last_parent, path_hash, new_seed)
 
-        # Stacking: Apply multiple mutations to generate the candidate
-        if self.power_schedule:
-            candidate = self.power_schedule.choose(self.seeds).data
-        else:
-            candidate = seed.data
-        # Apply power schedule to generate the candidate
-        #
-        trials = random.randint(self.min_mutations, self.max_mutations)
-        for i in range(trials):
-            candidate = self.mutate(candidate)
-        return candidate
+    def _generation_state(self):
+        return self._last_operations, self._last_parent, self._last_seed
+
+    def _restore_generation_state(self, state):
+        self._last_operations, self._last_parent, self._last_seed = state
+
+    def _make_seed(self, input) -> AbstractSeed:
+        """Create the seed of an input that increased coverage."""
+        return AbstractSeed(input)
 
-    def mutate(self, s):
-        """Return s with a random mutation applied"""
-        mutator = random.choice(self.mutators)
-        return mutator(s)
+    def _corpus_size(self) -> int:
+        return len(self.seeds)
 
-    def _delete_random_character(self, s):
-        """Returns s with a random character deleted"""
-        if len(s) > 5:
-            pos = random.randint(0, len(s) - 1)
-            return s[:pos] + s[pos + 1 :]
+    def _replay_executes(self) -> bool:
+        return self.power_schedule is not None and self.power_schedule.uses_input_coverage
+
+    def replay(self, index: int, interesting: list[int]) -> str:
+        # The corpus already holds the seeds of the campaign
+        corpus, self.corpus = self.corpus, None
+        try:
+            return super().replay(index, interesting)
+        finally:
+            self.corpus = corpus
+
+    def mutator_stats(self) -> dict[str, dict]:
+        """How often each mutator was used and found new coverage."""
+        return self.mutation_engine.stats()
+
+    def _create_candidate(self):
+        """Return the next candidate, generating a new batch when needed.
+        Seeds added during a batch are used from the next batch on."""
+        if not self._candidates:
+            self._candidates = self._create_candidates(self.batch_size)
+            self._candidates.reverse()
+        candidate, self._last_operations, self._last_parent = self._candidates.pop()
+        return candidate
+
+    def _create_candidates(self, k: int) -> list[tuple[str, tuple[int, ...], AbstractSeed]]:
+        start = time.perf_counter_ns()
+        # Apply power schedule to choose the parents of the batch
+        if self.power_schedule:
+            parents = [self.power_schedule.choose(self.seeds) for _ in range(k)]
         else:
-            return s
-
-    def _insert_random_character(self, s):
-        """Returns s with a random character inserted"""
-        pos = random.randint(0, len(s))
-        random_character = chr(random.randrange(32, 127))
-        return s[:pos] + random_character + s[pos:]
-
-    def _replace_random_character(self, s):
-        """Returns s with a random character replaced"""
-        if s == "":
-            return ""
-        pos = random.randint(0, len(s) - 1)
-        random_character = chr(random.randrange(32, 127))
-        return s[:pos] + random_character + s[pos + 1 :]
+            parents = self.rng.choices(self.seeds, k=k)
+        chosen = time.perf_counter_ns()
+        # Stacking: Apply multiple mutations to generate each candidate
+        candidates, operations = self.mutation_engine.mutate_batch(
+            [seed.data for seed in parents], [seed.data for seed in self.seeds]
+        )
+        self.stats.add("schedule", chosen - start)
+        self.stats.add("mutate", time.perf_counter_ns() - chosen)
+        return list(zip(candidates, operations, parents))
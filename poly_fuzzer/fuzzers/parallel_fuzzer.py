@@ -0,0 +1,161 @@
+import hashlib
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from poly_fuzzer.fuzzers.mutation_fuzzer import MutationFuzzer
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.random_state import derive_rng
+from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
+
+
+class CorpusSync:
+    """
+    # The `CorpusSync` class shares interesting inputs between the workers of a campaign through a local directory.
+    Each worker writes its seeds in its own sub-directory, one file per seed named after its content hash,
+    and periodically collects the seeds published by the other workers.
+    """
+
+    def __init__(self, sync_dir: str, worker_id: int):
+        self.sync_dir = sync_dir
+        self.worker_dir = os.path.join(sync_dir, f"worker_{worker_id}")
+        os.makedirs(self.worker_dir, exist_ok=True)
+        self._seen = set()
+
+    def publish(self, data: str):
+        """Write `data` in the directory of the worker."""
+        encoded = data.encode("utf-8", "surrogatepass")
+        name = hashlib.sha1(encoded).hexdigest()
+        self._seen.add(name)
+        path = os.path.join(self.worker_dir, name)
+        if os.path.exists(path):
+            return
+        # Write then rename so other workers never read a partial file
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encoded)
+        os.replace(tmp_path, path)
+
+    def collect(self) -> list[str]:
+        """Return the seeds published by the other workers since the last call."""
+        new_seeds = []
+        for worker_name in os.listdir(self.sync_dir):
+            worker_dir = os.path.join(self.sync_dir, worker_name)
+            if worker_dir == self.worker_dir or not os.path.isdir(worker_dir):
+                continue
+            for name in os.listdir(worker_dir):
+                if name.endswith(".tmp") or name in self._seen:
+                    continue
+                self._seen.add(name)
+                with open(os.path.join(worker_dir, name), "rb") as f:
+                    new_seeds.append(f.read().decode("utf-8", "surrogatepass"))
+        return new_seeds
+
+
+def _fuzzing_worker(
+        worker_id: int,
+        program_module,
+        seeds: list[AbstractSeed],
+        budget: int,
+        power_schedule: AbstractPowerSchedule | None,
+        sync_dir: str,
+        sync_interval: int,
+        seed: int,
+    ) -> dict:
+    """Run one worker of a parallel campaign and return its results."""
+    # Each worker derives its own random streams from the campaign seed
+    if power_schedule is not None:
+        power_schedule.rng = derive_rng(seed, "worker", worker_id, "schedule")
+
+    executor = AbstractExecutor(program_module)
+    fuzzer = MutationFuzzer(
+        executor, [AbstractSeed(s.data) for s in seeds], power_schedule,
+        rng=derive_rng(seed, "worker", worker_id, "fuzzer"),
+    )
+    corpus = CorpusSync(sync_dir, worker_id)
+    fuzzer._init_data()
+    imported = 0
+
+    # Imported seeds are executed too: they count in the executions and the budget
+    executions = 0
+    fuzzed = 0
+    start_time = time.perf_counter()
+    while executions < budget:
+        input, new_coverage = fuzzer.fuzz_one()
+        executions += 1
+        fuzzed += 1
+        if new_coverage:
+            corpus.publish(input)
+
+        if fuzzed % sync_interval == 0:
+            # Executing the seeds of the other workers merges their coverage in ours
+            for data in corpus.collect():
+                if executions >= budget:
+                    break
+                _, _, new_coverage = executor._execute_input(data)
+                executions += 1
+                if new_coverage:
+                    fuzzer.seeds.append(AbstractSeed(data))
+                    imported += 1
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        "worker_id": worker_id,
+        "coverage": fuzzer.data["coverage"],
+        "lines": executor.coverage,
+        "exceptions": fuzzer.data["exceptions"],
+        "executions": executions,
+        "fuzzed_inputs": fuzzed,
+        "imported_seeds": imported,
+        "execs_per_sec": executions / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def run_parallel_campaign(
+        program_module,
+        seeds: list[AbstractSeed],
+        budget: int,
+        n_workers: int | None = None,
+        power_schedule: AbstractPowerSchedule | None = None,
+        sync_dir: str | None = None,
+        sync_interval: int = 100,
+        seed: int | None = None,
+    ) -> dict:
+    """Fuzz `program_module` with `n_workers` processes (one per core by default),
+    each with its own executor and mutation fuzzer running `budget` inputs, the seeds imported
+    from the other workers included.
+    Workers share their interesting seeds every `sync_interval` inputs through `sync_dir`
+    (a temporary directory by default)."""
+    assert len(seeds) > 0, "Error: No seed provided."
+    n_workers = n_workers or os.cpu_count() or 1
+    if seed is None:
+        seed = random.randrange(2**32)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sync_dir = sync_dir or tmp_dir
+        start_time = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [
+                pool.submit(
+                    _fuzzing_worker, worker_id, program_module, seeds, budget,
+                    power_schedule, sync_dir, sync_interval, seed,
+                )
+                for worker_id in range(n_workers)
+            ]
+            workers = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start_time
+
+    lines = set().union(*(worker["lines"] for worker in workers))
+    executions = sum(worker["executions"] for worker in workers)
+
+    return {
+        "coverage": len(lines),
+        "lines": lines,
+        "executions": executions,
+        "exceptions": sum(worker["exceptions"] for worker in workers),
+        "execs_per_sec": executions / elapsed if elapsed > 0 else 0.0,
+        "workers": workers,
+    }
@@ -7,20 +7,20 @@ from poly_fuzzer.fuzzers.abstract_fuzzer import AbstractFuzzer
 class RandomFuzzer(AbstractFuzzer):
     '''
     A random fuzzer that generates random strings of a specified length.'''
-    def __init__(self, executor, min_length=90, max_length=100):
-        super().__init__(executor)
+    def __init__(self, executor, min_length=90, max_length=100, rng: random.Random | None = None):
+        super().__init__(executor, rng)
         self.min_length = min_length
         self.max_length = max_length
 
-    def _update(self, input):
+    def _update(self, input, new_coverage):
         pass
 
     def generate_random_string(self, length):
         """Generate a random string of specified length."""
         letters = string.ascii_letters + string.digits + string.punctuation
-        return "".join(random.choice(letters) for _ in range(length))
+        return "".join(self.rng.choice(letters) for _ in range(length))
 
     def generate_input(self):
         return self.generate_random_string(
-            random.randint(self.min_length, self.max_length)
+            self.rng.randint(self.min_length, self.max_length)
         )
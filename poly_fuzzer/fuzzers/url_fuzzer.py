@@ -1,14 +1,12 @@
 from urllib.parse import urlparse
 from html.parser import HTMLParser
 from typing import TypedDict
-from random import randint
-
-import matplotlib.pyplot as plt
-import numpy as np
+import random
 
 from poly_fuzzer.fuzzers.mutation_fuzzer import MutationFuzzer
 from poly_fuzzer.common.abstract_executor import AbstractExecutor
 from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.budget import Budget
 from poly_fuzzer.power_schedules.url_schedule import URLPowerSchedule
 from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
 from poly_fuzzer.common.abstract_grammar import AbstractGrammar
@@ -17,7 +15,13 @@ FuzzingOutput = TypedDict("FuzzingOutput", {
     "coverage": list[int],
     "inputs": list[str],
     "execution_times": list[float],
-    "exceptions": int
+    "executions": int,
+    "exceptions": int,
+    "execs_per_sec": float,
+    "run_time": float,
+    "stop_reason": str | None,
+    "interesting": list[int],
+    "crashes": int,
 })
 
 NUMBER_RUNS: int = 25
@@ -31,6 +35,21 @@ URL_PARSE_SEEDS: list[AbstractSeed] = [
     AbstractSeed('https://www.youtube.com/watch?v=u6QfIXgjwGQ'),
     AbstractSeed('https://moodle.polymtl.ca/course/view.php?id=994')
 ]
+URL_GRAMMAR: AbstractGrammar = AbstractGrammar({
+    "<start>": ["<url>"],
+    "<url>": ["https://www.<content><domain>/<param>?<letter>=<value>"],
+    "<domain>": [".ca", ".com", ".org"],
+    "<content>": ["<letter>"] * 10,
+    "<letter>": [
+        "a", "b", "c", "d", "e", "f", "g", "h", "i", "j" ,"k", "l", "m", 
+        "n", "o", "p", "q", "r", "s", "t", "u", "v", "w", "x", "y", "z",
+        "A", "B", "C", "D", "E", "F", "G", "H", "I", "J" ,"K", "L", "M",
+        "N", "O", "P", "Q", "R", "S", "T", "U", "V", "W", "X", "Y", "Z"
+    ],
+    "<param>": ["search", "watch", "database"],
+    "<value>": ["1", "2", "3", "4", "5", "6", "7", "8", "9", "10"]
+})
+URL_PARSE_RESULTS_PATH: str = "results/url_parse.npz"
 
 HTML_PARSER_BUDGET: int = 500
 HTML_PARSER_SEEDS: list[AbstractSeed] = [
@@ -40,12 +59,18 @@ HTML_PARSER_SEEDS: list[AbstractSeed] = [
     AbstractSeed('<html><head><title>Titre</title></head><body><p>Lien</p></body></html>'),
     AbstractSeed('<html><head><title>Titre</title></head><body><p>Lien</p><p>Lotto</p></body></html>')
 ]
+HTML_PARSER_RESULTS_PATH: str = "results/html_parse.npz"
+
+
+def reset_html_parser(feed) -> None:
+    """Remet à zéro le HTMLParser de `feed` avant chaque entrée (mode persistant)"""
+    feed.__self__.reset()
 
 
 def test_mutation_fuzzer(
         executor: AbstractExecutor,
         seeds: list[AbstractSeed],
-        budget: int,
+        budget: int | Budget,
         power_schedule: AbstractPowerSchedule | None=None,
     ) -> FuzzingOutput:    
     assert len(seeds) > 0, "Error: No seed provided."
@@ -54,42 +79,25 @@ def test_mutation_fuzzer(
 
 def test_url_parse():
     """Effectue des tests de fuzzing pour le module url_parse"""
+    # matplotlib et NumPy ne sont chargés que pour l'expérience et ses figures
+    import matplotlib.pyplot as plt
+    import numpy as np
+    from poly_fuzzer.fuzzers.experiment_runner import ExperimentConfig, run_experiment
 
-    coverages_no_power_no_grammar = []
-    coverages_with_power_no_grammar = []
-    coverages_with_power_with_grammar = []
-
-    grammar = AbstractGrammar({
-        "<start>": ["<url>"],
-        "<url>": ["https://www.<content><domain>/<param>?<letter>=<value>"],
-        "<domain>": [".ca", ".com", ".org"],
-        "<content>": ["<letter>"] * 10,
-        "<letter>": [
-            "a", "b", "c", "d", "e", "f", "g", "h", "i", "j" ,"k", "l", "m", 
-            "n", "o", "p", "q", "r", "s", "t", "u", "v", "w", "x", "y", "z",
-            "A", "B", "C", "D", "E", "F", "G", "H", "I", "J" ,"K", "L", "M",
-            "N", "O", "P", "Q", "R", "S", "T", "U", "V", "W", "X", "Y", "Z"
-        ],
-        "<param>": ["search", "watch", "database"],
-        "<value>": ["1", "2", "3", "4", "5", "6", "7", "8", "9", "10"]
-    })
-    seeds = lambda : [AbstractSeed(grammar.generate_input()) for _ in range(MAX_SEEDS)]
-
-    for _ in range(NUMBER_RUNS):
+    results = run_experiment([
         # Test sans power schedule ou grammaire
-        output = test_mutation_fuzzer(AbstractExecutor(urlparse), URL_PARSE_SEEDS, URL_PARSE_BUDGET)
-        coverage = output['coverage']
-        coverages_no_power_no_grammar.append(coverage)
-
+        ExperimentConfig("no_power_no_grammar", urlparse, URL_PARSE_BUDGET, URL_PARSE_SEEDS),
         # Test avec power schedule, sans grammaire
-        output = test_mutation_fuzzer(AbstractExecutor(urlparse), URL_PARSE_SEEDS, URL_PARSE_BUDGET, URLPowerSchedule())
-        coverage = output['coverage']
-        coverages_with_power_no_grammar.append(coverage)
-
+        ExperimentConfig("with_power_no_grammar", urlparse, URL_PARSE_BUDGET, URL_PARSE_SEEDS, URLPowerSchedule()),
         # Test avec power schedule et grammaire
-        output = test_mutation_fuzzer(AbstractExecutor(urlparse), seeds(), URL_PARSE_BUDGET, URLPowerSchedule())
-        coverage = output['coverage']
-        coverages_with_power_with_grammar.append(coverage)
+        ExperimentConfig(
+            "with_power_with_grammar", urlparse, URL_PARSE_BUDGET, power_schedule=URLPowerSchedule(),
+            grammar=URL_GRAMMAR, n_generated_seeds=MAX_SEEDS
+        ),
+    ], NUMBER_RUNS, output_path=URL_PARSE_RESULTS_PATH)
+    coverages_no_power_no_grammar = results["no_power_no_grammar"]
+    coverages_with_power_no_grammar = results["with_power_no_grammar"]
+    coverages_with_power_with_grammar = results["with_power_with_grammar"]
 
     avg_coverage_no_power_no_grammar = np.average(coverages_no_power_no_grammar, axis=0)
     print("Couverture moyenne pour aucun power schedule et grammaire:", avg_coverage_no_power_no_grammar[-1])
@@ -127,50 +135,55 @@ def test_url_parse():
 
     plt.show()
 
-def test_html_parse():
-    """Effectue des tests de fuzzing pour le module html_parse"""
-
-    def generate_input() -> str:
-        HTML_ELEMENT = ["<p>LOG6305</p>", "<li>Lien</li>", "<span>Hello World!</span>"]
-        GRAMMAR = {
-            "<html_content>": [
-                ["<body>", "<content>", "</body>"],
-                ["<head>", "</head>", "<body>", "<content>", "</body>"]
-            ],
-        }
-
-        html_content = GRAMMAR["<html_content>"][randint(0, 1)]
-        html = ""
+def generate_html_input(rng: random.Random | None = None) -> str:
+    """Génère une page HTML simple à partir d'une petite grammaire"""
+    randint = (rng or random).randint
+    HTML_ELEMENT = ["<p>LOG6305</p>", "<li>Lien</li>", "<span>Hello World!</span>"]
+    GRAMMAR = {
+        "<html_content>": [
+            ["<body>", "<content>", "</body>"],
+            ["<head>", "</head>", "<body>", "<content>", "</body>"]
+        ],
+    }
 
-        for element in html_content:
-            if element == "<content>":
-                html += HTML_ELEMENT[randint(0, len(HTML_ELEMENT) - 1)]
-            else:
-                html += element
+    html_content = GRAMMAR["<html_content>"][randint(0, 1)]
+    html = ""
 
-        return html
+    for element in html_content:
+        if element == "<content>":
+            html += HTML_ELEMENT[randint(0, len(HTML_ELEMENT) - 1)]
+        else:
+            html += element
 
-    coverages_no_power_no_grammar = []
-    coverages_with_power_no_grammar = []
-    coverages_with_power_with_grammar = []
+    return html
 
-    seeds = lambda : [AbstractSeed(generate_input()) for _ in range(MAX_SEEDS)]
+def test_html_parse():
+    """Effectue des tests de fuzzing pour le module html_parse"""
+    # matplotlib et NumPy ne sont chargés que pour l'expérience et ses figures
+    import matplotlib.pyplot as plt
+    import numpy as np
+    from poly_fuzzer.fuzzers.experiment_runner import ExperimentConfig, run_experiment
 
-    for _ in range(NUMBER_RUNS):
+    # Chaque essai reçoit sa propre copie du HTMLParser, remise à zéro avant chaque entrée
+    results = run_experiment([
         # Test sans power schedule ou grammaire
-        output = test_mutation_fuzzer(AbstractExecutor(HTMLParser().feed), HTML_PARSER_SEEDS, HTML_PARSER_BUDGET)
-        coverage = output['coverage']
-        coverages_no_power_no_grammar.append(coverage)
-
+        ExperimentConfig(
+            "no_power_no_grammar", HTMLParser().feed, HTML_PARSER_BUDGET, HTML_PARSER_SEEDS, reset=reset_html_parser
+        ),
         # Test avec power schedule, sans grammaire
-        output = test_mutation_fuzzer(AbstractExecutor(HTMLParser().feed), HTML_PARSER_SEEDS, HTML_PARSER_BUDGET, URLPowerSchedule())
-        coverage = output['coverage']
-        coverages_with_power_no_grammar.append(coverage)
-
+        ExperimentConfig(
+            "with_power_no_grammar", HTMLParser().feed, HTML_PARSER_BUDGET, HTML_PARSER_SEEDS, URLPowerSchedule(),
+            reset=reset_html_parser
+        ),
         # Test avec power schedule et grammaire
-        output = test_mutation_fuzzer(AbstractExecutor(HTMLParser().feed), seeds(), HTML_PARSER_BUDGET, URLPowerSchedule())
-        coverage = output['coverage']
-        coverages_with_power_with_grammar.append(coverage)
+        ExperimentConfig(
+            "with_power_with_grammar", HTMLParser().feed, HTML_PARSER_BUDGET, power_schedule=URLPowerSchedule(),
+            seed_generator=generate_html_input, n_generated_seeds=MAX_SEEDS, reset=reset_html_parser
+        ),
+    ], NUMBER_RUNS, output_path=HTML_PARSER_RESULTS_PATH)
+    coverages_no_power_no_grammar = results["no_power_no_grammar"]
+    coverages_with_power_no_grammar = results["with_power_no_grammar"]
+    coverages_with_power_with_grammar = results["with_power_with_grammar"]
 
     avg_coverage_no_power_no_grammar = np.average(coverages_no_power_no_grammar, axis=0)
     print("Couverture moyenne pour aucun power schedule et grammaire:", avg_coverage_no_power_no_grammar[-1])
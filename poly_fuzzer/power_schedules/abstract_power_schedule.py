@@ -1,5 +1,6 @@
 import abc
 from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.sum_tree import SumTree
 import random
 
 
@@ -9,11 +10,20 @@ class AbstractPowerSchedule:
     In your implementation consider assigninng more energy to
     seeds that are shorter, that execute faster, and yield coverage increases more often. Implement this in the
     _assign_energy method. The _normalized_energy method should then normalize the energy values to sum to 1.
+    The energies are kept in a `SumTree`: the energy of a seed is computed once when it joins the population
+    and `choose` costs O(log n). Schedules whose energies change later call `_update_energy` for those seeds.
     """
 
-    def __init__(self) -> None:
+    # Whether the energies depend on the lines covered by each input (path hashes, line counts).
+    # Such a campaign can only be replayed by executing the target again.
+    uses_input_coverage = False
+
+    def __init__(self, rng: random.Random | None = None) -> None:
         """Constructor"""
         self.path_frequency: dict = {}
+        self.rng = rng if rng is not None else random.Random()
+        self._energies = SumTree()
+        self._seeds: list[AbstractSeed] | None = None
 
     @abc.abstractmethod
     def _assign_energy(self, seeds: list[AbstractSeed]) -> list[AbstractSeed]:
@@ -30,9 +40,32 @@ class AbstractPowerSchedule:
         norm_energy = [nrg / sum_energy for nrg in energy]
         return norm_energy
 
+    def _sync(self, seeds: list[AbstractSeed]):
+        """Add the energy of the seeds appended since the last call.
+        The tree is rebuilt if another population is given."""
+        if seeds is not self._seeds or len(seeds) < len(self._energies):
+            self._seeds = seeds
+            self._energies = SumTree()
+        for seed in seeds[len(self._energies):]:
+            self._assign_energy([seed])
+            self._energies.append(seed.energy)
+
+    def update(self, parent: AbstractSeed | None, path_hash: int, new_seed: AbstractSeed | None):
+        """Feedback after each execution: the seed the input was mutated from (None for initial seeds),
+        the hash of the path it exercised and the seed it was added as, if it increased coverage.
+        Nothing to do for schedules whose energy does not depend on the results."""
+        pass
+
+    def _update_energy(self, index: int, energy: float):
+        """Change the energy of the seed at `index` of the population."""
+        self._seeds[index].energy = energy
+        self._energies.update(index, energy)
+
+    def _choose_index(self, seeds: list[AbstractSeed]) -> int:
+        self._sync(seeds)
+        assert self._energies.total > 0, "Energy should be greater than zero."
+        return self._energies.find(self.rng.random() * self._energies.total)
+
     def choose(self, seeds: list[AbstractSeed]) -> AbstractSeed:
         """Choose weighted by normalized energy."""
-        seeds = self._assign_energy(seeds)
-        norm_energy = self._normalized_energy(seeds)
-        seed = random.choices(seeds, weights=norm_energy)[0]
-        return seed
+        return seeds[self._choose_index(seeds)]
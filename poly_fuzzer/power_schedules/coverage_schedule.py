@@ -0,0 +1,117 @@
+import random
+
+from poly_fuzzer.power_schedules.abstract_power_schedule import AbstractPowerSchedule
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+
+
+class CoveragePowerSchedule(AbstractPowerSchedule):
+    """Exponential schedule of AFLFast, combined with the speed and length factors of AFL.
+    The energy of a seed is
+        (1 + discoveries) * speed factor * length factor / path_frequency[path of the seed] ** exponent
+    so the budget goes to short, fast seeds that exercise rarely seen paths and often find new coverage.
+    By default, the speed factor uses the number of lines covered by the seed as its cost: measured
+    execution times vary from run to run, a campaign using them cannot be reproduced from its random seeds
+    nor replayed. `measured_speed` uses the measured execution time of the seeds instead.
+    Path frequencies are divided by the lowest frequency of the population (updated on every full refresh),
+    so energies stay around 1 instead of vanishing as frequencies grow; only their ratios matter.
+    https://www.fuzzingbook.org/html/GreyboxFuzzer.html#Boosted-Greybox-Fuzzing
+    """
+
+    uses_input_coverage = True
+
+    # Energies are recomputed before the total drops below this value
+    MIN_TOTAL_ENERGY = 1e-6
+
+    def __init__(self, rng: random.Random | None = None, exponent: float = 5, measured_speed: bool = False) -> None:
+        """Constructor"""
+        super().__init__(rng)
+        self.exponent = exponent
+        self.measured_speed = measured_speed
+        # Number of executed inputs that exercised each path
+        self.path_frequency: dict = {}
+        # Indices of the seeds exercising each path
+        self._path_seeds: dict = {}
+        self._index: dict[int, int] = {}
+        # Running totals used for the speed and length factors
+        self._total_cost = 0
+        self._total_length = 0
+        self._measured = 0
+        self._updates_since_refresh = 0
+        # Lowest path frequency of the population at the last full refresh
+        self._reference_frequency = 1
+
+    def _cost(self, seed: AbstractSeed) -> float:
+        return seed.exec_time if self.measured_speed else seed.coverage
+
+    def _seed_energy(self, seed: AbstractSeed) -> float:
+        frequency = self.path_frequency.get(seed.path_hash, 1)
+        energy = (1 + seed.discoveries) / (frequency / self._reference_frequency) ** self.exponent
+        if self._measured:
+            average_cost = self._total_cost / self._measured
+            average_length = self._total_length / self._measured
+            cost = self._cost(seed)
+            speed = average_cost / cost if cost > 0 else 3
+            length = average_length / len(seed.data) if seed.data else 3
+            energy *= min(max(speed, 0.1), 3) * min(max(length, 0.25), 3)
+        return energy
+
+    def _assign_energy(self, seeds: list[AbstractSeed]) -> list[AbstractSeed]:
+        """Assigns seed energy from its path frequency, speed, length and discoveries."""
+        for seed in seeds:
+            seed.energy = self._seed_energy(seed)
+        return seeds
+
+    def _sync(self, seeds: list[AbstractSeed]):
+        if seeds is not self._seeds or len(seeds) < len(self._energies):
+            self._index = {}
+            self._path_seeds = {}
+        start = len(self._energies) if seeds is self._seeds else 0
+        super()._sync(seeds)
+        for index in range(start, len(seeds)):
+            self._index[id(seeds[index])] = index
+            self._path_seeds.setdefault(seeds[index].path_hash, []).append(index)
+
+    def _refresh(self, seed: AbstractSeed | None):
+        if seed is None or self._seeds is None:
+            return
+        index = self._index.get(id(seed))
+        if index is not None:
+            self._update_energy(index, self._seed_energy(seed))
+
+    def update(self, parent: AbstractSeed | None, path_hash: int, new_seed: AbstractSeed | None):
+        """Count the path of the input and credit its parent when it found new coverage."""
+        self.path_frequency[path_hash] = self.path_frequency.get(path_hash, 0) + 1
+        if self._seeds is None:
+            return
+
+        if new_seed is not None:
+            self._total_cost += self._cost(new_seed)
+            self._total_length += len(new_seed.data)
+            self._measured += 1
+            if parent is not None:
+                parent.discoveries += 1
+                self._refresh(parent)
+
+        # Only the seeds on the path whose frequency changed see their energy change
+        for index in self._path_seeds.get(path_hash, []):
+            self._update_energy(index, self._seed_energy(self._seeds[index]))
+
+        # Initial seeds learn their path once executed, the averages drift: refresh every energy
+        # once per len(seeds) updates, which keeps the amortized cost of an update at O(log n)
+        self._updates_since_refresh += 1
+        if self._updates_since_refresh >= len(self._energies) or self._energies.total < self.MIN_TOTAL_ENERGY:
+            self._refresh_all()
+
+    def _refresh_all(self):
+        """Recompute every energy against the current lowest path frequency and rebuild the tree."""
+        self._updates_since_refresh = 0
+        seeds = self._seeds[:len(self._energies)]
+        if not seeds:
+            return
+        self._path_seeds = {}
+        for index, seed in enumerate(seeds):
+            self._path_seeds.setdefault(seed.path_hash, []).append(index)
+        self._reference_frequency = min(self.path_frequency.get(path, 1) for path in self._path_seeds)
+        for seed in seeds:
+            seed.energy = self._seed_energy(seed)
+        self._energies.rebuild([seed.energy for seed in seeds])
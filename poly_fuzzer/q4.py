@@ -3,11 +3,12 @@ from html.parser import HTMLParser
 
 import cgi_decode
 
-from poly_fuzzer.fuzzers.url_fuzzer import test_mutation_fuzzer, URL_PARSE_SEEDS, HTML_PARSER_SEEDS, URL_PARSE_BUDGET, HTML_PARSER_BUDGET
+from poly_fuzzer.fuzzers.url_fuzzer import test_mutation_fuzzer, reset_html_parser, URL_PARSE_SEEDS, HTML_PARSER_SEEDS, URL_PARSE_BUDGET, HTML_PARSER_BUDGET
 from poly_fuzzer.fuzzers.cgi_fuzzer import SEEDS as CGI_SEEDS
 from poly_fuzzer.fuzzers.cgi_fuzzer import BUDGET as CGI_BUDGET
 from poly_fuzzer.power_schedules.url_schedule import URLPowerSchedule
 from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.persistent_executor import PersistentExecutor
 
 N_RUNS: int = 10
 
@@ -27,7 +28,7 @@ if __name__ == '__main__':
         coverage = test_mutation_fuzzer(executor, URL_PARSE_SEEDS, URL_PARSE_BUDGET)['coverage'][-1]
         max_url_coverage = max(max_url_coverage, coverage)
 
-        executor = AbstractExecutor(HTMLParser().feed)
+        executor = PersistentExecutor(HTMLParser().feed, reset=reset_html_parser)
         power = URLPowerSchedule()
         coverage = test_mutation_fuzzer(executor, HTML_PARSER_SEEDS, HTML_PARSER_BUDGET, power)['coverage'][-1]
         max_html_coverage = max(max_html_coverage, coverage)
@@ -0,0 +1,209 @@
+"""Throughput benchmarks of the hot paths of the fuzzer.
+
+`run_benchmarks()` returns `{"meta": {...}, "results": {name: value}}`, every value being higher-is-better
+(executions or operations per second), so two result files can be compared with `compare`.
+Run it with `python -m poly_fuzzer bench --output bench.json [--compare previous.json]`.
+"""
+import platform
+import random
+import subprocess
+import sys
+import time
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.persistent_executor import PersistentExecutor
+
+# Inputs are distinct so caches of the targets (e.g. urlparse) do not hide their real cost
+N_INPUTS = 1000
+REPEATS = 3
+
+URL_SEEDS = ["https://www.google.com/search?q=allo", "http://localhost:8080", "https://a.b/c;d?e=f#g"]
+HTML_SEEDS = ["<html><head><title>Titre</title></head><body><p>Lien</p></body></html>", "<!-- c --><a href='x'>y</a>"]
+CGI_SEEDS = ["a+b%41c", "Hello+World%21", "%7e%7E+x"]
+
+
+def _inputs(seeds: list[str], n: int, rng: random.Random) -> list[str]:
+    """`n` distinct inputs, each seed with a few random characters inserted."""
+    inputs = []
+    for i in range(n):
+        s = seeds[i % len(seeds)]
+        for _ in range(3):
+            pos = rng.randint(0, len(s))
+            s = s[:pos] + chr(rng.randrange(32, 127)) + s[pos:]
+        inputs.append(s + str(i))
+    return inputs
+
+
+def _best_rate(func, n: int, repeats: int = REPEATS) -> float:
+    """Operations per second of the fastest of `repeats` runs of `func()`, which performs `n` operations."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        func()
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return n * 1e9 / max(best, 1)
+
+
+def _untraced(target, inputs: list[str], reset=None):
+    def run():
+        for input in inputs:
+            if reset is not None:
+                reset(target)
+            try:
+                target(input)
+            except Exception:
+                pass
+    return run
+
+
+def _traced(executor, inputs: list[str]):
+    def run():
+        for input in inputs:
+            executor._execute_input(input)
+    return run
+
+
+def _tracers() -> list[str]:
+    tracers = ["settrace", "legacy"]
+    if sys.version_info >= (3, 12):
+        tracers.insert(0, "monitoring")
+    return tracers
+
+
+def bench_targets(results: dict, n_inputs: int = N_INPUTS):
+    """execs/sec of each target, untraced and under `AbstractExecutor` with each tracer."""
+    from cgi_decode import cgi_decode, cgi_decode_many
+
+    rng = random.Random(0)
+    parser = HTMLParser()
+    reset_parser = lambda feed: feed.__self__.reset()
+    targets = [
+        ("cgi_decode", cgi_decode, _inputs(CGI_SEEDS, n_inputs, rng), None),
+        ("urlparse", urlparse, _inputs(URL_SEEDS, n_inputs, rng), None),
+        ("html_parser_feed", parser.feed, _inputs(HTML_SEEDS, n_inputs, rng), reset_parser),
+    ]
+    for name, target, inputs, reset in targets:
+        results[f"execs_per_sec/{name}/untraced"] = _best_rate(_untraced(target, inputs, reset), len(inputs))
+        for tracer in _tracers():
+            if reset is None:
+                executor = AbstractExecutor(target, tracer=tracer)
+            else:
+                executor = PersistentExecutor(target, reset=reset, verify_runs=0, tracer=tracer)
+            results[f"execs_per_sec/{name}/{tracer}"] = _best_rate(_traced(executor, inputs), len(inputs))
+
+    # Batched decoder, invalid inputs included
+    inputs = _inputs(CGI_SEEDS, n_inputs, rng)
+    results["execs_per_sec/cgi_decode_many/untraced"] = _best_rate(
+        lambda: cgi_decode_many(inputs, return_exceptions=True), len(inputs)
+    )
+
+
+def bench_create_candidate(results: dict, n_calls: int = 10000):
+    """Candidates per second of `MutationFuzzer._create_candidate`, with and without power schedule."""
+    from poly_fuzzer.fuzzers.mutation_fuzzer import MutationFuzzer
+    from poly_fuzzer.power_schedules.url_schedule import URLPowerSchedule
+
+    rng = random.Random(0)
+    for name, schedule in (("no_schedule", None), ("url_schedule", URLPowerSchedule(random.Random(0)))):
+        seeds = [AbstractSeed(s) for s in _inputs(URL_SEEDS, 100, rng)]
+        fuzzer = MutationFuzzer(None, seeds, schedule, rng=random.Random(0))
+
+        def run():
+            for _ in range(n_calls):
+                fuzzer._create_candidate()
+        results[f"ops_per_sec/create_candidate/{name}"] = _best_rate(run, n_calls)
+
+
+def bench_schedule_choose(results: dict, sizes=(10, 1000, 100000), n_calls: int = 10000):
+    """Picks per second of `URLPowerSchedule.choose` for growing corpus sizes."""
+    from poly_fuzzer.power_schedules.url_schedule import URLPowerSchedule
+
+    for size in sizes:
+        seeds = [AbstractSeed(str(i)) for i in range(size)]
+        schedule = URLPowerSchedule(random.Random(0))
+        # Half of the corpus was already chosen
+        schedule.path_frequency.update(seeds[::2])
+        schedule.choose(seeds)
+
+        def run():
+            for _ in range(n_calls):
+                schedule.choose(seeds)
+        results[f"ops_per_sec/url_schedule_choose/{size}"] = _best_rate(run, n_calls)
+
+
+def bench_generate_input(results: dict, n_calls: int = 2000):
+    """Inputs per second of `AbstractGrammar.generate_input`."""
+    from poly_fuzzer.common.abstract_grammar import AbstractGrammar
+
+    grammars = {
+        "url": {
+            "<start>": ["<url>"],
+            "<url>": ["https://www.<content><domain>/<param>?<letter>=<value>"],
+            "<domain>": [".ca", ".com", ".org"],
+            "<content>": ["<letter>", "<letter><content>"],
+            "<letter>": [chr(c) for c in range(ord("a"), ord("z") + 1)],
+            "<param>": ["search", "watch", "database"],
+            "<value>": [str(i) for i in range(1, 11)],
+        },
+        "expr": {
+            "<start>": ["<expr>"],
+            "<expr>": ["<term> + <expr>", "<term> - <expr>", "<term>"],
+            "<term>": ["<factor> * <term>", "<factor> / <term>", "<factor>"],
+            "<factor>": ["+<factor>", "-<factor>", "(<expr>)", "<integer>"],
+            "<integer>": ["<digit><integer>", "<digit>"],
+            "<digit>": [str(i) for i in range(10)],
+        },
+    }
+    for name, gram in grammars.items():
+        grammar = AbstractGrammar(gram, random.Random(0))
+
+        def run():
+            for _ in range(n_calls):
+                grammar.generate_input()
+        results[f"ops_per_sec/generate_input/{name}"] = _best_rate(run, n_calls)
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(quick: bool = False) -> dict:
+    """Run the whole suite. `quick` divides the work by 10 for a smoke run."""
+    scale = 10 if quick else 1
+    results = {}
+    bench_targets(results, N_INPUTS // scale)
+    bench_create_candidate(results, 10000 // scale)
+    bench_schedule_choose(results, n_calls=10000 // scale)
+    bench_generate_input(results, 2000 // scale)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "revision": _git_revision(),
+            "time": time.time(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> dict[str, dict]:
+    """Relative change of every benchmark present in both runs, as `{"change": ..., "regression": ...}`.
+    Every benchmark being higher-is-better, a change below `-threshold` is a regression."""
+    changes = {}
+    for name, value in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous:
+            change = value / previous - 1
+            changes[name] = {"change": change, "regression": change < -threshold}
+    return changes
@@ -0,0 +1,113 @@
+import heapq
+
+from poly_fuzzer.common.abstract_executor import AbstractExecutor
+from poly_fuzzer.common.abstract_seed import AbstractSeed
+from poly_fuzzer.common.corpus_store import CorpusStore
+from poly_fuzzer.common.crash_triage import exception_type_name
+
+
+def seed_coverage(seeds: list[AbstractSeed], executor: AbstractExecutor | None = None, cache: dict | None = None) -> dict[str, set]:
+    """Lines covered by each seed, by seed data.
+    Lines found in `cache` are reused, the other seeds are executed with `executor`."""
+    coverage = {}
+    for seed in seeds:
+        if cache is not None and cache.get(seed.data) is not None:
+            coverage[seed.data] = cache[seed.data]
+        else:
+            assert executor is not None, "Error: no cached coverage and no executor for " + repr(seed.data)
+            executor._execute_input(seed.data)
+            coverage[seed.data] = set(executor.input_coverage)
+    return coverage
+
+
+def minimize_corpus(seeds: list[AbstractSeed], executor: AbstractExecutor | None = None, cache: dict | None = None) -> list[AbstractSeed]:
+    """Corpus distillation (cmin): return a small subset of `seeds` covering the same lines,
+    chosen by greedy set cover. Between seeds adding as many new lines, the shortest is kept."""
+    coverage = seed_coverage(seeds, executor, cache)
+    uncovered = set().union(*coverage.values()) if coverage else set()
+
+    # Lazy greedy: the gain of a seed can only decrease, so stale heap entries are re-evaluated when popped
+    heap = [(-len(coverage[seed.data]), len(seed.data), i) for i, seed in enumerate(seeds)]
+    heapq.heapify(heap)
+    kept = []
+    while uncovered and heap:
+        _, length, i = heapq.heappop(heap)
+        gain = len(coverage[seeds[i].data] & uncovered)
+        if gain == 0:
+            continue
+        if heap and (-gain, length, i) > heap[0]:
+            heapq.heappush(heap, (-gain, length, i))
+            continue
+        kept.append(seeds[i])
+        uncovered -= coverage[seeds[i].data]
+    return kept
+
+
+def minimize_store(store: CorpusStore, executor: AbstractExecutor | None = None) -> list[AbstractSeed]:
+    """Distill the seeds of a corpus store, using the covered lines recorded with them."""
+    seeds = store.load_seeds()
+    cache = {seed.data: store.lines(store.content_hash(seed.data)) for seed in seeds}
+    return minimize_corpus(seeds, executor, cache)
+
+
+def minimize_input(data: str, test) -> str:
+    """Test-case minimization (tmin) with delta debugging: return a smaller input for which
+    `test(input)` still holds. Every input is tested at most once.
+    https://www.fuzzingbook.org/html/Reducer.html"""
+    results = {}
+
+    def passes(candidate: str) -> bool:
+        if candidate not in results:
+            results[candidate] = test(candidate)
+        return results[candidate]
+
+    assert passes(data), "Error: the input to minimize does not pass the test."
+    n = 2
+    while len(data) >= 2:
+        chunk = len(data) // n
+        reduced = False
+        for start in range(0, len(data), chunk):
+            complement = data[:start] + data[start + chunk:]
+            if passes(complement):
+                data = complement
+                n = max(n - 1, 2)
+                reduced = True
+                break
+        if not reduced:
+            if n >= len(data):
+                break
+            n = min(n * 2, len(data))
+    return data
+
+
+def keeps_coverage(executor: AbstractExecutor, lines: set):
+    """Test for `minimize_input`: the input still covers all of `lines`."""
+    def test(candidate: str) -> bool:
+        executor._execute_input(candidate)
+        return lines <= executor.input_coverage
+    return test
+
+
+def raises(program_module, exception_type: type):
+    """Test for `minimize_input`: the target still raises `exception_type`."""
+    def test(candidate: str) -> bool:
+        try:
+            program_module(candidate)
+        except exception_type:
+            return True
+        except Exception:
+            return False
+        return False
+    return test
+
+
+def raises_like(executor: AbstractExecutor, exception: BaseException):
+    """Test for `minimize_input`: `executor` still reports an exception of the type of `exception`.
+    Unlike `raises`, it works with executors running the target in another process,
+    whose exceptions are `RemoteException`s."""
+    expected = exception_type_name(exception)
+
+    def test(candidate: str) -> bool:
+        executor._execute_input(candidate)
+        return executor.last_exception is not None and exception_type_name(executor.last_exception) == expected
+    return test